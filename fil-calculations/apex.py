@@ -1,5 +1,8 @@
-import copy
+import sys
 
+import numpy as np
+
+import graph
 import proofs
 from proofs import *
 from util import *
@@ -26,6 +29,12 @@ def apex_savings(zigzag, apex_height, optimization_fn):
     return (savings, optimized_cost)
 
 def optimal_apex(zigzag, optimization_fn):
+    if optimization_fn is apex:
+        return optimal_apex_vectorized(zigzag)
+    return optimal_apex_loop(zigzag, optimization_fn)
+
+# optimal_apex, evaluating optimization_fn(zigzag, l) for each candidate height l in turn.
+def optimal_apex_loop(zigzag, optimization_fn):
     best_savings = 0
     best_l = 0
     actual_best = zigzag.total_seal_time()
@@ -45,33 +54,99 @@ def optimize(zigzag):
     return optimal_apex(zigzag, apex)
 
 #######################################################
-# Optimization Functions
+# Vectorized apex evaluation. Every apex term in ZigZag is closed-form in apex_height, so total_seal_time can be
+# calculated for all candidate heights at once, without building a ZigZag (or MerkleTree) per candidate.
 
-def identity(zigzag, _apex_height): return zigzag
+def candidate_apex_heights(zigzag):
+    # apex height 1 is undefined
+    return np.arange(2, zigzag.merkle_tree().height)
+
+# total_seal_time of apex(zigzag, h) for each h in apex_heights, evaluated by the graph (graph.py) for all heights at
+# once. Height 0 (no apex) uses the graph without apex terms, as ZigZag does.
+def apex_seal_times(zigzag, apex_heights):
+    h = np.asarray(apex_heights, dtype=np.float64)
+    seal_times = np.empty(h.shape)
+    for with_apex in (False, True):
+        selected = (h > 0) == with_apex
+        if np.any(selected):
+            compiled = graph.compile_graph(graph.Schema(zigzag.instance is not None, with_apex), ('total_seal_time',))
+            values = graph.parameters(zigzag, compiled.parameters)
+            values['apex_height'] = h[selected]
+            seal_times[selected] = compiled.evaluate(values)['total_seal_time']
+    return seal_times
+
+@dataclass
+class ApexCurve:
+    """total_seal_time and savings (relative to zigzag as given) for each candidate apex height."""
+    apex_heights: np.ndarray
+    seal_times: np.ndarray
+    savings: np.ndarray
+
+    def best(self):
+        i = np.argmin(self.seal_times)
+        return (int(self.apex_heights[i]), self.savings[i], self.seal_times[i])
+
+def apex_curve(zigzag, apex_heights=None):
+    apex_heights = candidate_apex_heights(zigzag) if apex_heights is None else np.asarray(apex_heights)
+    seal_times = apex_seal_times(zigzag, apex_heights)
+    return ApexCurve(apex_heights, seal_times, zigzag.total_seal_time() - seal_times)
+
+# Same result as optimal_apex(zigzag, apex), without evaluating a ZigZag per candidate height.
+def optimal_apex_vectorized(zigzag):
+    curve = apex_curve(zigzag)
+    (best_l, best_savings, actual_best) = curve.best()
+    if best_savings <= 0:
+        (best_l, best_savings, actual_best) = (0, 0, zigzag.total_seal_time())
 
-def apex(zigzag, apex_height):
-    optimized = copy.deepcopy(zigzag)
-    optimized.apex_height = apex_height
+    return (best_l, best_savings, humanize_seconds(best_savings), humanize_seconds(actual_best))
 
-    return optimized
+# Jointly optimize apex height, partitions and merkle hash for minimum total_seal_time.
+# Returns (total_seal_time, apex_height, partitions, merkle_hash) for the best combination.
+def optimize_jointly(zigzag, partitions=(1, 2, 4, 8, 16), hashes=(pedersen, blake2s, pb50)):
+    best = None
+    for hash_function in hashes:
+        if hash_function == zigzag.merkle_hash:
+            hashed = zigzag
+        elif zigzag.instance:
+            hashed = zigzag.scaled_for_new_hash(hash_function)
+        else:
+            hashed = replace(zigzag, merkle_hash=hash_function)
+
+        for p in partitions:
+            candidate = replace(hashed, partitions=p, size=None if hashed.instance else hashed.size)
+            curve = apex_curve(candidate, np.concatenate(([0], candidate_apex_heights(candidate))))
+            (l, _, seal_time) = curve.best()
+            if best is None or seal_time < best[0]:
+                best = (seal_time, l, p, hash_function)
+
+    return best
 
 #######################################################
+# Optimization Functions
 
-z = ZigZag(security=proofs.filecoin_security_requirements, partitions=8, size=64*GiB)
-(l, _, _, _) = optimize(z)
-a = apex(z, l)
-
+def identity(zigzag, _apex_height): return zigzag
 
-zz = ZigZag(security=proofs.filecoin_security_requirements, partitions=8, size=64*GiB, merkle_hash=proofs.blake2s)
-(l, _, _, _) = optimize(zz)
-aa = apex(zz, l)
+def apex(zigzag, apex_height):
+    # size must be None when an instance is present; it is recalculated from the instance.
+    return replace(zigzag, apex_height=apex_height, size=None if zigzag.instance else zigzag.size)
 
-x = ZigZag(security=proofs.filecoin_security_requirements, instance=projected_instance, partitions=8)
-(l, _, _, _) = optimize(x)
-y = apex(x, l)
-#y = apex(x, 17)
+#######################################################
 
-xx = x.scaled_for_new_hash(proofs.blake2s)
-(l, _, _, _) = optimize(xx)
-yy = apex(xx, l)
-#yy = apex(xx,17)
+# Examples, built on first access (e.g. apex.a) so that importing this module does not run any optimizations.
+
+def optimized_example(name):
+    zigzag = getattr(sys.modules[__name__], name)
+    (l, _, _, _) = optimize(zigzag)
+    return apex(zigzag, l)
+
+__getattr__ = lazy_attributes(globals(), {
+    'z': lambda: ZigZag(security=proofs.filecoin_security_requirements, partitions=8, size=64*GiB),
+    'a': lambda: optimized_example('z'),
+    'zz': lambda: ZigZag(security=proofs.filecoin_security_requirements, partitions=8, size=64*GiB,
+                         merkle_hash=proofs.blake2s),
+    'aa': lambda: optimized_example('zz'),
+    'x': lambda: ZigZag(security=proofs.filecoin_security_requirements, instance=projected_instance, partitions=8),
+    'y': lambda: optimized_example('x'),
+    'xx': lambda: sys.modules[__name__].x.scaled_for_new_hash(proofs.blake2s),
+    'yy': lambda: optimized_example('xx'),
+})
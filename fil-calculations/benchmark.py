@@ -0,0 +1,160 @@
+"""Benchmarks for the calculator's own hot paths.
+
+Run from fil-calculations:
+
+    python benchmark.py                  # run, and compare against benchmark_baseline.json
+    python benchmark.py --save           # run, and store the results as the new baseline
+    python benchmark.py performance mvs  # run only cases whose names contain any of the given strings
+
+Each case is timed in a fresh interpreter, which imports this module (and so every module it uses) in the same order,
+so one case's warm caches, garbage and imports do not skew another's. The baseline stores each case's time relative to
+the reference case (performance), which is always run, so that it carries over between machines: what it records is
+how much slower than a single ZigZag.performance each case is. Exits with status 1 if any case's relative time exceeds
+its baseline by more than --tolerance; cases faster than baseline / tolerance are reported, as a sign the baseline is
+stale and should be re-saved. A change to the reference case itself shows as every other case moving the other way.
+Relative times still depend somewhat on the Python and NumPy versions, so re-save the baseline after changing either,
+as well as after intended changes to hot paths.
+
+This is a plain timeit script in the style of asv (named cases, a stored baseline, comparison against it) rather than
+a pytest suite: environment.yml has pytest, but neither pytest-benchmark nor asv, and plain pytest has no timing or
+baseline support.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+from dataclasses import replace
+
+import numpy as np
+
+import apex
+import graph
+import solver
+import sweep
+from perf_data import x1e32_xlarge_64, filecoin_zigzag
+from proofs import ZigZag, GiB, blake2s, pedersen, pb50, filecoin_scaling_requirements, filecoin_security_requirements
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+reference_case = 'performance'
+
+def cases():
+    """Benchmark cases: name -> zero-argument callable."""
+    x1e32_64 = ZigZag(security=filecoin_security_requirements, instance=x1e32_xlarge_64, partitions=8)
+    relaxed = replace(filecoin_zigzag, relax_time=2, size=None)
+    no_instance = ZigZag(security=filecoin_security_requirements, partitions=8, size=64 * GiB)
+    plot_sizes = range(1, 1024, 16) # as in proofs_analysis.graph_hash_seal_times
+    sweep_sizes = np.arange(1, 10001) * GiB
+    grid = {'merkle_hash': [pedersen, blake2s, pb50], 'partitions': [1, 2, 4, 8], 'apex_height': [0, 10]}
+
+    return {
+        'performance': lambda: filecoin_zigzag.performance(64 * GiB),
+        'performance_x1e32_64': lambda: x1e32_64.performance(64 * GiB),
+        'performance_size_loop_64': lambda: [filecoin_zigzag.performance(size * GiB).total_seal_time
+                                             for size in plot_sizes],
+        'performance_array_10000': lambda: filecoin_zigzag.performance_array(sweep_sizes),
+        'scaled_for_new_hash': lambda: filecoin_zigzag.scaled_for_new_hash(blake2s),
+        'mvs_closed_form': lambda: solver.minimum_viable_sector_size(relaxed, filecoin_scaling_requirements),
+        'mvs_bisection': lambda: solver.bisect_minimum_viable_sector_size(relaxed, filecoin_scaling_requirements),
+        'mvs_method': lambda: relaxed.minimum_viable_sector_size(filecoin_scaling_requirements),
+        'optimal_apex_instance': lambda: apex.optimize(filecoin_zigzag),
+        'optimal_apex_no_instance': lambda: apex.optimize(no_instance),
+        'optimal_apex_loop': lambda: apex.optimal_apex_loop(filecoin_zigzag, apex.apex),
+        'sweep_24_in_process': lambda: sweep.sweep(grid, base=filecoin_zigzag, max_workers=0),
+        'graph_metrics': lambda: graph.evaluate(filecoin_zigzag),
+        'graph_array_10000': lambda: graph.evaluate(no_instance, sweep_sizes),
+    }
+
+def measure(fn, repeat=5, min_time=0.1):
+    """Best-of-repeat seconds per call, with enough calls per repeat to take at least min_time."""
+    timer = timeit.Timer(fn)
+    number = _calls_for(timer, min_time)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def _calls_for(timer, min_time):
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            return number
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+# Seconds per call of the case name, measured in a fresh interpreter.
+def measure_isolated(name, repeat=5, min_time=0.1):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', name, '--repeat', str(repeat),
+                             '--min-time', str(min_time)],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    return float(output)
+
+def run(selected=None, repeat=5, min_time=0.1, isolated=True):
+    results = {}
+    for (name, fn) in cases().items():
+        if selected and name != reference_case and not any(s in name for s in selected):
+            continue
+        results[name] = measure_isolated(name, repeat, min_time) if isolated else measure(fn, repeat, min_time)
+    return results
+
+# Seconds per call of each case, as a multiple of the reference case's.
+def relative(results):
+    return {name: seconds / results[reference_case] for (name, seconds) in results.items()}
+
+def compare(ratios, baseline, tolerance=1.5):
+    """Cases slower than tolerance * baseline, relative to the reference case: name -> (ratio, baseline ratio)."""
+    return {name: (ratio, baseline[name]) for (name, ratio) in ratios.items()
+            if name in baseline and ratio > tolerance * baseline[name]}
+
+def improvements(ratios, baseline, tolerance=1.5):
+    """Cases faster than baseline / tolerance, relative to the reference case: name -> (ratio, baseline ratio)."""
+    return {name: (ratio, baseline[name]) for (name, ratio) in ratios.items()
+            if name in baseline and ratio * tolerance < baseline[name]}
+
+def format_seconds(seconds):
+    for (scale, unit) in ((1, 's'), (1e-3, 'ms'), (1e-6, 'µs')):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cases', nargs='*', help='only run cases whose names contain one of these')
+    parser.add_argument('--baseline', default=default_baseline)
+    parser.add_argument('--save', action='store_true', help='save results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds per repeat')
+    parser.add_argument('--in-process', action='store_true', help='time all cases in this process')
+    parser.add_argument('--case', help=argparse.SUPPRESS) # time one case, printing seconds per call
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(repr(measure(cases()[args.case], args.repeat, args.min_time)))
+        return 0
+
+    results = run(args.cases, repeat=args.repeat, min_time=args.min_time, isolated=not args.in_process)
+    ratios = relative(results)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    for (name, seconds) in results.items():
+        change = f'{ratios[name] / baseline[name]:.2f}x baseline' if name in baseline else 'no baseline'
+        print(f'{name:<28} {format_seconds(seconds):>10} {ratios[name]:>10.3g}x {reference_case}   {change}')
+
+    if args.save:
+        baseline.update(ratios)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        return 0
+
+    regressions = compare(ratios, baseline, args.tolerance)
+    for (name, (ratio, base)) in regressions.items():
+        print(f'REGRESSION {name}: {ratio:.3g}x {reference_case} vs baseline {base:.3g}x')
+    for (name, (ratio, base)) in improvements(ratios, baseline, args.tolerance).items():
+        print(f'FASTER {name}: {ratio:.3g}x {reference_case} vs baseline {base:.3g}x (re-save the baseline?)')
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Opt-in memoization for pure derived quantities of the model dataclasses.
+
+Disabled by default. Enable with cache.enable(); inspect with cache.stats().
+
+Entries are keyed on the values of the model's dataclass fields (recursively), so a model produced by replace()
+never sees results computed for the model it was derived from.
+"""
+
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from functools import wraps
+
+enabled = False
+default_maxsize = 4096
+
+class LRUCache:
+    def __init__(self, maxsize=default_maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        try:
+            value = self.entries[key]
+        except TypeError:
+            # Unhashable key, e.g. a model with array-valued fields (see montecarlo.py): compute, but don't cache.
+            return compute()
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self.entries[key] = value
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            return value
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+caches = {} # qualified function name -> LRUCache
+
+def hash_once(cls):
+    """Class decorator for frozen dataclasses: keep the field hash once computed.
+
+    The generated __hash__ hashes every field, recursively through nested models, on every call, which costs more than
+    most of the lookups it keys. Since frozen models never change, the hash is computed on first use and stored on the
+    instance. It is not pickled: hashes of strings differ between processes.
+    """
+    field_hash = cls.__hash__
+
+    def __hash__(self):
+        try:
+            return self.__dict__['_hash']
+        except KeyError:
+            value = field_hash(self) # TypeError for array-valued models, which stay unhashable
+            object.__setattr__(self, '_hash', value)
+            return value
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_hash', None)
+        return state
+
+    cls.__hash__ = __hash__
+    cls.__getstate__ = __getstate__
+    return cls
+
+_field_names = {} # dataclass type -> tuple of field names, or None if hashable
+
+def model_key(obj):
+    """Hashable key for a model object: the object itself if hashable, otherwise its field values."""
+    cls = type(obj)
+    try:
+        names = _field_names[cls]
+    except KeyError:
+        names = None
+        if is_dataclass(cls) and cls.__hash__ is None:
+            names = tuple(f.name for f in fields(cls))
+        _field_names[cls] = names
+
+    if names is None:
+        return obj
+    return (cls,) + tuple(model_key(getattr(obj, name)) for name in names)
+
+def memoized(method):
+    """Memoize method on its arguments (including self) while caching is enabled."""
+    cache = caches.setdefault(method.__qualname__, LRUCache())
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not enabled:
+            return method(self, *args, **kwargs)
+        key = (model_key(self), args, tuple(sorted(kwargs.items())))
+        return cache.get(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+def enable(maxsize=default_maxsize):
+    global enabled
+    enabled = True
+    for cache in caches.values():
+        cache.maxsize = maxsize
+
+def disable():
+    global enabled
+    enabled = False
+
+def clear():
+    for cache in caches.values():
+        cache.clear()
+
+def stats():
+    """Dict of function name -> (hits, misses, hit rate, entries)."""
+    return {name: (cache.hits, cache.misses, cache.hit_rate(), len(cache.entries)) for (name, cache) in caches.items()}
@@ -0,0 +1,134 @@
+"""Groth proving time calibrated from benchmark runs.
+
+proofs.constraint_proving_time and perf_data.projected_proving_time scale a single benchmark linearly in constraints.
+Here proving time is instead fitted to many benchmarks, as core-seconds for `partitions` circuits of `constraints`
+constraints each, on a machine with `cores` cores at `clock_speed_ghz`:
+
+    cycles per circuit = b * n + c * n log2(n) * (cores - 1)
+    core-seconds       = partitions * cycles per circuit / (clock_speed_ghz * 10**9)
+
+b * n is the per-constraint work, and the last term the overhead of spreading a circuit over more cores (which is why
+large proofs have not scaled linearly). The FFTs and multi-exponentiations cost a * n log2(n) in principle, but over
+the benchmarked range (16M to 880M constraints) log2(n) varies by under a quarter, so that term cannot be told apart
+from b * n: fitted alongside it, its coefficient came out negative and was dropped. It is left out until benchmarks
+span a wider range. Coefficients are fitted by least squares on relative error, so small and large benchmarks count
+alike. Features whose coefficients would be negative are dropped, so the model never predicts negative time.
+"""
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+import perf_data
+from proofs import Machine
+
+feature_names = ('n', 'n_log_n_cores')
+
+@dataclass(frozen=True)
+class Sample:
+    """One benchmark: core-seconds to prove partitions circuits of constraints constraints each."""
+    constraints: float # per partition
+    partitions: int
+    cores: int
+    clock_speed_ghz: float
+    core_seconds: float
+    description: str = ""
+
+# Feature matrix (core-seconds per unit coefficient, one row per element) for arrays of constraints, partitions, cores
+# and clock speeds, broadcast together.
+def features(constraints, partitions, cores, clock_speed_ghz):
+    n = np.asarray(constraints, dtype=np.float64)
+    n_log_n = n * np.log2(n)
+    scale = np.asarray(partitions, dtype=np.float64) / (np.asarray(clock_speed_ghz, dtype=np.float64) * 10**9)
+    extra_cores = np.asarray(cores, dtype=np.float64) - 1
+    columns = np.broadcast_arrays(n * scale, n_log_n * extra_cores * scale)
+    return np.column_stack([column.ravel() for column in columns])
+
+@dataclass(frozen=True)
+class ProvingTimeModel:
+    coefficients: tuple # cycles, one per feature_names
+    samples: int
+    relative_rms_error: float
+
+    # Core-seconds to prove partitions circuits of constraints each. Vectorized over all arguments.
+    def core_seconds(self, constraints, partitions=1, cores=1, clock_speed_ghz=1):
+        shape = np.broadcast(constraints, partitions, cores, clock_speed_ghz).shape
+        x = features(constraints, partitions, cores, clock_speed_ghz)
+        return (x @ np.array(self.coefficients)).reshape(shape)[()]
+
+    def machine_core_seconds(self, constraints, machine, partitions=1):
+        return self.core_seconds(constraints, partitions, machine.cores or 1, machine.clock_speed_ghz)
+
+    # Marginal core-seconds per constraint at constraints, for ZigZag.constraint_proving_time.
+    def constraint_proving_time(self, constraints, machine, partitions=1):
+        step = constraints * 1e-3
+        return float((self.machine_core_seconds(constraints + step, machine, partitions)
+                      - self.machine_core_seconds(constraints, machine, partitions)) / step)
+
+    # Fraction of proving a circuit of constraints which does not parallelize across cores, in Amdahl's law terms:
+    # core-seconds on c cores are those on one core plus the n log2(n) (c - 1) overhead term, which is what
+    # work * (serial_fraction * c + 1 - serial_fraction) gives when serial_fraction = overhead per core / work.
+    def serial_fraction(self, constraints):
+        (b, c) = self.coefficients
+        return float(c * np.log2(constraints) / b)
+
+    # instance, with groth_proving_time predicted for its partitions (default: the instance's) of constraints each, on
+    # its machine. A drop-in for hand-projected instances such as perf_data.projected_instance. groth_acceleration is
+    # still applied by ZigZag.
+    def calibrated_instance(self, instance, partitions=None):
+        partitions = partitions or instance.partitions
+        predicted = float(self.machine_core_seconds(instance.constraints, instance.machine, partitions))
+        return replace(instance, groth_proving_time=predicted, partitions=partitions)
+
+# Least squares fit of samples, minimizing relative error.
+def fit(samples):
+    samples = list(samples)
+    assert samples, "no samples to fit"
+    columns = lambda name: np.array([getattr(s, name) for s in samples], dtype=np.float64)
+    x = features(columns('constraints'), columns('partitions'), columns('cores'), columns('clock_speed_ghz'))
+    y = columns('core_seconds')
+    # Dividing each row by its target makes residuals relative.
+    x, ones = x / y[:, np.newaxis], np.ones_like(y)
+
+    active = list(range(x.shape[1]))[:len(samples)]
+    while True:
+        (solution, _, _, _) = np.linalg.lstsq(x[:, active], ones, rcond=None)
+        if np.all(solution >= 0) or len(active) == 1:
+            break
+        active.pop(int(np.argmin(solution)))
+
+    coefficients = np.zeros(x.shape[1])
+    coefficients[active] = np.maximum(solution, 0)
+    error = float(np.sqrt(np.mean((x @ coefficients - ones) ** 2)))
+    return ProvingTimeModel(tuple(coefficients.tolist()), len(samples), error)
+
+################################################################################
+# Samples
+
+def instance_sample(instance):
+    # Instance constraints are per partition; groth_proving_time is for all partitions.
+    return Sample(instance.constraints, instance.partitions, instance.machine.cores or 1,
+                  instance.machine.clock_speed_ghz, instance.groth_proving_time, instance.description)
+
+# Measured (not projected) benchmarks in perf_data, and the DIZK vs Bellman table row behind
+# proofs.constraint_proving_time (16M constraints, 2.785 minutes on 6 cores at 4GHz).
+def perf_data_samples():
+    return [instance_sample(perf_data.porcuquine_prover),
+            instance_sample(perf_data.ec2_x1e32_xlarge),
+            instance_sample(perf_data.x1e32_xlarge_64),
+            Sample(16e6, 1, 6, 4.0, 2.785 * 60 * 6, 'DIZK vs Bellman')]
+
+# Samples from an ingest.Catalog, for records with constraints and proving time.
+def catalog_samples(catalog, **criteria):
+    samples = []
+    for record in catalog.find(**criteria):
+        if record.get('constraints') and record.get('groth_proving_time'):
+            machine = Machine(**record['machine'])
+            samples.append(Sample(record['constraints'], record.get('partitions') or 1, machine.cores or 1,
+                                  machine.clock_speed_ghz, record['groth_proving_time'], record.get('description', '')))
+    return samples
+
+# Model fitted to perf_data_samples and, if given, the samples of catalog.
+def calibrate(catalog=None, **criteria):
+    samples = perf_data_samples() + (catalog_samples(catalog, **criteria) if catalog else [])
+    return fit(samples)
@@ -0,0 +1,75 @@
+"""Dollars and energy per sealed TiB.
+
+Seal times are core-seconds. A machine with `cores` cores provides cores core-seconds per second, so core-seconds /
+cores / 3600 is the instance-hours they occupy, and Machine.hourly_cost prices those hours. Energy uses
+ZigZag.core_power: each busy core draws its share of processor_power.
+
+Replication is charged to the replication machine and proving to the proving machine, which default to the instance's
+machine.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from hybrid import with_hash
+from proofs import GiB, TiB
+
+def instance_hours(core_seconds, machine):
+    return core_seconds / ((machine.cores or 1) * 60 * 60)
+
+@dataclass
+class CostArray:
+    """Costs of sealing one ZigZag, evaluated over an array of sector sizes."""
+    sizes: np.ndarray # bytes
+    replication_hours: np.ndarray # instance-hours per sector
+    proving_hours: np.ndarray # instance-hours per sector
+    dollars_per_TiB: np.ndarray # nan if a machine has no hourly_cost
+    kWh_per_TiB: np.ndarray
+
+    def sectors_per_TiB(self):
+        return TiB / self.sizes
+
+# Costs of sealing zigzag at each of sizes (default: its sector size).
+def cost_array(zigzag, sizes=None, replication_machine=None, proving_machine=None):
+    replication_machine = replication_machine or zigzag.instance.machine
+    proving_machine = proving_machine or zigzag.instance.machine
+    sizes = np.asarray(sizes if sizes is not None else [zigzag.sector_size()], dtype=np.float64)
+    performance = zigzag.performance_array(sizes)
+
+    replication_hours = instance_hours(performance.replication_time, replication_machine)
+    proving_hours = instance_hours(performance.total_proving_time, proving_machine)
+    hourly = lambda machine: machine.hourly_cost if machine.hourly_cost is not None else np.nan
+    sector_dollars = replication_hours * hourly(replication_machine) + proving_hours * hourly(proving_machine)
+    sector_Wh = (performance.replication_time * zigzag.core_power(replication_machine)
+                 + performance.total_proving_time * zigzag.core_power(proving_machine)) / (60 * 60)
+
+    per_TiB = TiB / sizes
+    return CostArray(sizes, replication_hours, proving_hours, sector_dollars * per_TiB, sector_Wh / 1000 * per_TiB)
+
+# Costs for each hash function (applied with scaled_for_new_hash when there is an instance) over sizes.
+# Returns hash function -> CostArray.
+def cost_by_hash(zigzag, hash_functions, sizes=None, replication_machine=None, proving_machine=None):
+    return {h: cost_array(with_hash(zigzag, h), sizes, replication_machine, proving_machine) for h in hash_functions}
+
+@dataclass
+class FleetCost:
+    dollars_per_TiB: float # all machines, busy or idle, for the whole makespan
+    kWh_per_TiB: float # busy cores only
+    TiB_per_day: float
+
+# Cost per TiB of a fleet simulated by schedule.simulate(config, ...), with replication_machines and proving_machines
+# copies of config's machines. Unlike cost_array, this charges for machines left idle by the schedule.
+def fleet_cost(result, config, replication_machines=1, proving_machines=1):
+    machines = ((config.replication_machine, replication_machines, 'replication'),
+                (config.proving_machine, proving_machines, 'proving'))
+    TiB_sealed = result.sectors * result.sector_size / TiB
+    hours = result.makespan / (60 * 60)
+
+    dollars = sum(machine.hourly_cost * count * hours if machine.hourly_cost is not None else np.nan
+                  for (machine, count, _) in machines)
+    busy_core_seconds = {kind: result.utilization[kind] * (machine.cores or 1) * count * result.makespan
+                         for (machine, count, kind) in machines}
+    Wh = sum(busy_core_seconds[kind] * config.zigzag.core_power(machine) / (60 * 60)
+             for (machine, _, kind) in machines)
+    return FleetCost(dollars / TiB_sealed, Wh / 1000 / TiB_sealed, result.bytes_per_day() / TiB)
@@ -0,0 +1,347 @@
+"""ZigZag metrics as a dependency graph of named quantities.
+
+ZigZag's methods call each other (total_seal_time -> groth_proving_time -> net_apex_constraints -> merkle_tree ...), so
+one evaluation recomputes shared terms many times. Here each quantity is defined once, as a function of model
+parameters (dotted field paths, as in proofs.with_field, plus 'size' and 'sector_size') and other quantities:
+
+    compiled = compile_graph(schema(zigzag))
+    compiled(zigzag)['total_seal_time']
+    dependencies('total_seal_time', schema(zigzag)) # the parameters it depends on
+
+compile_graph orders the quantities needed for the requested outputs, so that one pass computes each exactly once. Whether a ZigZag has an instance, and whether it uses an apex, select between definitions; this is
+the schema, and a graph is compiled once per schema and outputs. The definitions are NumPy expressions, so any
+parameter may be an array (of sizes, or samples), and results broadcast.
+
+Evaluation holds the values of one evaluation, and recomputes only the quantities downstream of changed parameters.
+Results match the corresponding ZigZag methods, whose constants (tree sizes, apex counts) they share; discrepancies
+compares the two, and `python graph.py` does so for a model of each schema.
+"""
+
+from collections import namedtuple
+from dataclasses import dataclass
+from operator import attrgetter, itemgetter
+
+import numpy as np
+
+from proofs import GiB, Instance, MerkleTree, ZigZag
+
+Schema = namedtuple('Schema', ['instance', 'apex'])
+
+def schema(zigzag):
+    return Schema(zigzag.instance is not None, zigzag.apex_height > 0)
+
+@dataclass(frozen=True)
+class Definition:
+    name: str
+    inputs: tuple # names of parameters and quantities
+    function: object
+    instance: bool = None # the schemas it applies to: None for any
+    apex: bool = None
+
+    def applies(self, schema):
+        return (self.instance is None or self.instance == schema.instance) and \
+               (self.apex is None or self.apex == schema.apex)
+
+definitions = []
+
+# Define the quantity name, computed by the decorated function from inputs (positionally).
+def quantity(name, *inputs, instance=None, apex=None):
+    def define(function):
+        definitions.append(Definition(name, inputs, function, instance, apex))
+        return function
+    return define
+
+################################################################################
+# Definitions, mirroring the ZigZag methods of the same names. Where ZigZag implements the formula as a staticmethod
+# (security, constraint and proving time math), the graph uses that staticmethod itself.
+
+@quantity('degree', 'security.base_degree', 'security.expansion_degree')
+def _degree(base_degree, expansion_degree):
+    return base_degree + expansion_degree
+
+@quantity('nodes', 'size', 'hash_size')
+@quantity('sector_nodes', 'sector_size', 'hash_size')
+def _nodes(size, node_size):
+    return size / node_size
+
+@quantity('apex_count', 'apex_height')
+def _apex_count(apex_height):
+    return MerkleTree.apex_count(apex_height)
+
+@quantity('proof_hashes', 'nodes', 'apex_height')
+@quantity('sector_proof_hashes', 'sector_nodes', 'apex_height')
+def _proof_hashes(nodes, apex_height):
+    height = np.ceil(np.log2(nodes)) + 1
+    return (height - 1) - (apex_height - 1)
+
+quantity('hashing_constraints_per_challenge', 'proof_hashes', 'degree', 'merkle_hash.constraints',
+         'kdf_hash.constraints')(ZigZag.challenge_hashing_constraints)
+quantity('sector_hashing_constraints_per_challenge', 'sector_proof_hashes', 'degree', 'merkle_hash.constraints',
+         'kdf_hash.constraints')(ZigZag.challenge_hashing_constraints)
+
+@quantity('hashing_constraints', 'hashing_constraints_per_challenge', 'security.total_challenges', 'partitions')
+def _hashing_constraints(per_challenge, total_challenges, partitions):
+    return per_challenge * (total_challenges / partitions)
+
+@quantity('replicate_min', 'nodes', 'degree', 'kdf_hash.hash_time', 'security.layers', 'security.sloth_iter')
+def _replicate_min(nodes, degree, kdf_time, layers, sloth_iter):
+    return ((degree + 1) / 2) * kdf_time * nodes * layers + sloth_iter * nodes * layers
+
+@quantity('replicate_max', 'replicate_min', 'nodes', 'apex_count', 'merkle_hash.hash_time', 'security.layers',
+          'merkle_pessimization')
+def _replicate_max(replicate_min, nodes, apex_count, merkle_time, layers, merkle_pessimization):
+    return replicate_min + merkle_time * ((nodes - 1) - apex_count) * (layers + 1) * merkle_pessimization
+
+@quantity('replication_time', 'replicate_max', instance=False)
+def _replication_time_without_instance(replicate_max):
+    return replicate_max
+
+@quantity('replication_time_per_GiB', 'instance.encoding_replication_time_per_GiB', 'instance.merkle_tree_hash',
+          'instance.layers', instance=True)
+def _replication_time_per_GiB(encoding_time, merkle_tree_hash, layers):
+    return encoding_time + Instance.merkle_tree_time_per_GiB(merkle_tree_hash, layers)
+
+@quantity('replication_time', 'replication_time_per_GiB', 'apex_count', 'merkle_hash.hash_time', 'security.layers',
+          'hash_size', 'size', instance=True)
+def _replication_time_with_instance(per_GiB, apex_count, merkle_time, layers, node_size, size):
+    apex_merkle_time = apex_count * merkle_time * (layers + 1)
+    return (per_GiB - apex_merkle_time * np.floor(GiB / node_size) * node_size) * (size / GiB)
+
+@quantity('vanilla_proving_time', 'instance.vanilla_proving_time', instance=True)
+def _vanilla_proving_time(vanilla_proving_time):
+    return vanilla_proving_time
+
+@quantity('vanilla_proving_time', instance=False)
+@quantity('apex_constraints', apex=False)
+@quantity('apex_constraints_avoided', apex=False)
+@quantity('security_constraints', instance=False)
+def _zero():
+    return 0
+
+quantity('apex_constraints', 'apex_count', 'merkle_hash.constraints', apex=True)(ZigZag.apex_commitment_constraints)
+quantity('apex_constraints_avoided', 'apex_height', 'degree', 'security.total_challenges', 'merkle_hash.constraints',
+         'constraint_proving_time', apex=True)(ZigZag.apex_proof_constraints_avoided)
+
+@quantity('net_apex_constraints', 'apex_constraints', 'apex_constraints_avoided')
+def _net_apex_constraints(apex_constraints, apex_constraints_avoided):
+    return apex_constraints - apex_constraints_avoided
+
+quantity('security_constraints', 'sector_hashing_constraints_per_challenge', 'security.total_challenges', 'partitions',
+         'instance.constraints', 'instance.security.total_challenges', instance=True)(ZigZag.challenge_constraints)
+
+@quantity('constraints', 'instance.constraints', 'security_constraints', 'net_apex_constraints', instance=True)
+def _constraints_with_instance(instance_constraints, security_constraints, net_apex_constraints):
+    return instance_constraints + security_constraints + net_apex_constraints
+
+@quantity('constraints', 'hashing_constraints', instance=False)
+def _constraints_without_instance(hashing_constraints):
+    return hashing_constraints
+
+quantity('groth_proving_time', 'instance.groth_proving_time', 'instance.groth_acceleration', 'instance.constraints',
+         'instance.partitions', 'security_constraints', 'net_apex_constraints', 'partitions', 'constraint_proving_time',
+         instance=True)(ZigZag.instance_groth_proving_time)
+quantity('groth_proving_time', 'hashing_constraints', instance=False)(ZigZag.hashing_groth_proving_time)
+
+@quantity('total_proving_time', 'vanilla_proving_time', 'groth_proving_time')
+@quantity('total_seal_time', 'replication_time', 'total_proving_time')
+def _sum(a, b):
+    return a + b
+
+@quantity('proof_size', 'circuit_proof_size', 'partitions', 'hash_size')
+def _proof_size(circuit_proof_size, partitions, hash_size):
+    return (circuit_proof_size * partitions) + 3 * hash_size # comm_d, comm_r and comm_r_star
+
+# Per GiB, as in ZigZag.performance.
+@quantity('seal_time_per_GiB', 'total_seal_time', 'size', 'relax_time')
+def _seal_time_per_GiB(total_seal_time, size, relax_time):
+    return (GiB / size) * total_seal_time / relax_time
+
+@quantity('proof_size_per_GiB', 'proof_size', 'size')
+def _proof_size_per_GiB(proof_size, size):
+    return (GiB / size) * proof_size
+
+################################################################################
+
+metric_names = ('replication_time', 'vanilla_proving_time', 'groth_proving_time', 'total_proving_time',
+                'total_seal_time', 'constraints', 'proof_size', 'seal_time_per_GiB', 'proof_size_per_GiB')
+
+_graphs = {} # schema -> {quantity name -> Definition}
+
+# The definitions applying to schema, by quantity name.
+def graph(schema):
+    try:
+        return _graphs[schema]
+    except KeyError:
+        chosen = {d.name: d for d in definitions if d.applies(schema)}
+        _graphs[schema] = chosen
+        return chosen
+
+# Quantities needed to compute names, each after its inputs.
+def evaluation_order(names, schema):
+    definitions = graph(schema)
+    order = []
+    visited = set()
+
+    def visit(name):
+        if name in visited or name not in definitions:
+            return
+        visited.add(name)
+        for input in definitions[name].inputs:
+            visit(input)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+# Parameters which name (a quantity or parameter) depends on.
+def dependencies(name, schema):
+    definitions = graph(schema)
+    if name not in definitions:
+        return {name}
+    return {input for q in evaluation_order([name], schema) for input in definitions[q].inputs
+            if input not in definitions}
+
+# Quantities which depend on name (a parameter or quantity), each after its inputs.
+def dependents(name, schema):
+    definitions = graph(schema)
+    order = evaluation_order(definitions, schema)
+    affected = {name}
+    for q in order:
+        if any(input in affected for input in definitions[q].inputs):
+            affected.add(q)
+    return [q for q in order if q in affected and q != name]
+
+special_parameters = ('size', 'sector_size') # not fields of the ZigZag
+
+# Values of parameter names for zigzag, evaluated at size (default: the sector size).
+def parameters(zigzag, names, size=None):
+    special = {'size': size if size is not None else zigzag.sector_size(), 'sector_size': zigzag.sector_size()}
+    return {name: special[name] if name in special else attrgetter(name)(zigzag) for name in names}
+
+# Function of a list returning a tuple of the items at indices.
+def _getter(indices):
+    if len(indices) > 1:
+        return itemgetter(*indices)
+    return lambda values: tuple(values[i] for i in indices)
+
+class CompiledGraph:
+    """Flat evaluation function for outputs of schema's graph."""
+
+    def __init__(self, schema, outputs=metric_names):
+        definitions = graph(schema)
+        self.schema = schema
+        self.outputs = tuple(outputs)
+        self.order = evaluation_order(self.outputs, schema)
+        used = {input for q in self.order for input in definitions[q].inputs if input not in definitions}
+        self.special = [name for name in special_parameters if name in used]
+        self.fields = sorted(used - set(special_parameters))
+        self.parameters = self.special + self.fields
+        self.names = self.parameters + self.order
+        self.get_fields = attrgetter(*self.fields) if len(self.fields) > 1 else \
+            lambda zigzag: tuple(attrgetter(name)(zigzag) for name in self.fields)
+
+        # Each quantity in order, with a getter for its inputs among the values computed before it.
+        position = {name: i for (i, name) in enumerate(self.names)}
+        steps = tuple((definitions[q].function, _getter([position[input] for input in definitions[q].inputs]))
+                      for q in self.order)
+
+        def evaluate_all(values):
+            values = list(values)
+            append = values.append
+            for (function, inputs) in steps:
+                append(function(*inputs(values)))
+            return values
+        self.evaluate_all = evaluate_all
+        self.output_indices = [self.names.index(name) for name in self.outputs]
+
+    # Every parameter and quantity value, by name, for parameter values (by name).
+    def evaluate(self, values):
+        return dict(zip(self.names, self.evaluate_all(tuple(values[name] for name in self.parameters))))
+
+    # Outputs for zigzag at size (default: its sector size).
+    def __call__(self, zigzag, size=None):
+        assert schema(zigzag) == self.schema, "zigzag does not match the compiled schema"
+        sector_size = zigzag.sector_size()
+        special = {'size': size if size is not None else sector_size, 'sector_size': sector_size}
+        values = self.evaluate_all(tuple(special[name] for name in self.special) + self.get_fields(zigzag))
+        return {name: values[i] for (name, i) in zip(self.outputs, self.output_indices)}
+
+_compiled = {} # (schema, outputs) -> CompiledGraph
+
+def compile_graph(schema, outputs=metric_names):
+    key = (schema, tuple(outputs))
+    if key not in _compiled:
+        _compiled[key] = CompiledGraph(schema, outputs)
+    return _compiled[key]
+
+# Metrics of zigzag at size, using the compiled graph for its schema.
+def evaluate(zigzag, size=None, outputs=metric_names):
+    return compile_graph(schema(zigzag), outputs)(zigzag, size)
+
+class Evaluation:
+    """Values of a compiled graph for one set of parameters, recomputing only what changes when parameters change."""
+
+    def __init__(self, compiled, values):
+        self.compiled = compiled
+        self.values = compiled.evaluate(values)
+
+    @classmethod
+    def of(cls, zigzag, size=None, outputs=metric_names):
+        compiled = compile_graph(schema(zigzag), outputs)
+        return cls(compiled, parameters(zigzag, compiled.parameters, size))
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    # Set parameters (name -> value) and recompute the quantities depending on them. Returns those quantities' names.
+    def update(self, changes):
+        definitions = graph(self.compiled.schema)
+        unknown = set(changes) - set(self.compiled.parameters)
+        assert not unknown, f"not parameters of this graph: {sorted(unknown)}"
+        self.values.update(changes)
+        dirty = set(changes)
+        recomputed = []
+        for q in self.compiled.order:
+            definition = definitions[q]
+            if any(input in dirty for input in definition.inputs):
+                self.values[q] = definition.function(*(self.values[input] for input in definition.inputs))
+                dirty.add(q)
+                recomputed.append(q)
+        return recomputed
+
+################################################################################
+# Equivalence with the ZigZag methods.
+
+# Metrics of zigzag at size (default: its sector size) whose graph value differs from the ZigZag method's:
+# name -> (graph value, method value).
+def discrepancies(zigzag, size=None, rtol=1e-9):
+    size = size or zigzag.sector_size()
+    expected = {name: getattr(zigzag, name)(size) for name in ('replication_time', 'vanilla_proving_time',
+                                                               'groth_proving_time', 'total_proving_time',
+                                                               'total_seal_time', 'constraints')}
+    expected['proof_size'] = zigzag.proof_size()
+    # As ZigZag.performance, which requires an instance.
+    expected['seal_time_per_GiB'] = (GiB / size) * expected['total_seal_time'] / zigzag.relax_time
+    expected['proof_size_per_GiB'] = (GiB / size) * expected['proof_size']
+    values = evaluate(zigzag, size)
+    return {name: (values[name], value) for (name, value) in expected.items()
+            if not np.isclose(values[name], value, rtol=rtol, atol=0)}
+
+# A model of each schema, with and without instance and apex.
+def schema_examples():
+    from dataclasses import replace
+    from perf_data import filecoin_zigzag
+    without_instance = replace(filecoin_zigzag, instance=None, size=64 * GiB)
+    return [filecoin_zigzag, replace(filecoin_zigzag, apex_height=10, size=None), without_instance,
+            replace(without_instance, apex_height=12)]
+
+if __name__ == '__main__':
+    import sys
+    failed = False
+    for zigzag in schema_examples():
+        for size in (None, 4 * GiB):
+            for (name, (value, expected)) in discrepancies(zigzag, size).items():
+                print(f"{schema(zigzag)} size={size}: {name} is {value}, but ZigZag gives {expected}")
+                failed = True
+    sys.exit(failed)
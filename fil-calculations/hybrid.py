@@ -0,0 +1,123 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+import perf_data
+import solver
+from proofs import Instance, ZigZag, HashFunction, MerkleTree, GiB, hybrid_hash, pedersen, blake2s, \
+    filecoin_scaling_requirements, filecoin_security_requirements
+
+# A merkle tree whose top root_levels levels (counting the root's children as level 1) use root_hash, and whose other
+# levels use leaf_hash. Unlike hybrid_hash, where one fraction weights both hashing time and constraints, here the
+# fraction of hashes (which determines replication time) and the fraction of proof path hashes (which determines
+# constraints) differ: the top levels hold few of the tree's hashes but as many of each proof's hashes as any other.
+def level_hybrid_hash(leaf_hash, root_hash, root_levels, nodes):
+    path_length = MerkleTree.tree_height(nodes) - 1
+    root_levels = min(root_levels, path_length)
+    time_fraction = (2 ** root_levels - 1) / (nodes - 1)
+    constraint_fraction = root_levels / path_length
+    hash_time = (root_hash.hash_time * time_fraction) + (leaf_hash.hash_time * (1 - time_fraction))
+    constraints = (root_hash.constraints * constraint_fraction) + (leaf_hash.constraints * (1 - constraint_fraction))
+    return HashFunction(hash_time, constraints)
+
+def with_hash(zigzag, hash_function):
+    if zigzag.instance:
+        return zigzag.scaled_for_new_hash(hash_function)
+    return replace(zigzag, merkle_hash=hash_function)
+
+################################################################################
+# Objectives: functions of a zigzag, to be minimized.
+
+# Minimum viable sector size, without rounding to a power of two, so that the objective varies continuously with the
+# hash. Infinite when requirements cannot be met.
+def mvs_objective(requirements=filecoin_scaling_requirements):
+    def objective(zigzag):
+        if zigzag.instance:
+            bound = solver.minimum_viable_size_bound(zigzag, requirements)
+        else:
+            bound = solver.minimum_viable_sector_size(zigzag, requirements).sector_size
+        return math.inf if bound is None else bound
+    return objective
+
+def seal_time_objective(zigzag):
+    return zigzag.total_seal_time() * GiB / zigzag.sector_size()
+
+################################################################################
+
+@dataclass
+class HybridResult:
+    parameter: float # root_fraction or root_levels
+    value: float # objective value
+    hash_function: HashFunction
+    evaluations: int
+
+# Minimize f over [lo, hi] by golden-section search, in at most max_evaluations evaluations. The endpoints are always
+# evaluated too, since the objective need not be unimodal (and is often linear, with its minimum at an endpoint).
+def golden_section_minimize(f, lo=0.0, hi=1.0, tolerance=1e-3, max_evaluations=40):
+    invphi = (math.sqrt(5) - 1) / 2
+    evaluated = {lo: f(lo), hi: f(hi)}
+
+    a, b = lo, hi
+    c, d = b - invphi * (b - a), a + invphi * (b - a)
+    fc, fd = f(c), f(d)
+    evaluated.update({c: fc, d: fd})
+    while (b - a) > tolerance and len(evaluated) < max_evaluations:
+        if fc <= fd:
+            b, d, fd = d, c, fc
+            c = b - invphi * (b - a)
+            fc = evaluated[c] = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + invphi * (b - a)
+            fd = evaluated[d] = f(d)
+
+    x = min(evaluated, key=evaluated.get)
+    return (x, evaluated[x], len(evaluated))
+
+# Find the root_fraction of hybrid_hash(leaf_hash, root_hash, root_fraction) minimizing objective(zigzag with that
+# hash). Replaces evaluating 11 fixed ratios.
+def optimal_hybrid_ratio(zigzag, objective=None, leaf_hash=pedersen, root_hash=blake2s, tolerance=1e-3,
+                         max_evaluations=40):
+    objective = objective or mvs_objective()
+    f = lambda r: objective(with_hash(zigzag, hybrid_hash(leaf_hash, root_hash, r)))
+    (r, value, evaluations) = golden_section_minimize(f, 0, 1, tolerance, max_evaluations)
+    return HybridResult(r, value, hybrid_hash(leaf_hash, root_hash, r), evaluations)
+
+# Find how many of the merkle tree's top levels should use root_hash (the rest using leaf_hash) to minimize objective.
+# There is one candidate per level, so all are evaluated.
+def optimal_root_levels(zigzag, objective=None, leaf_hash=pedersen, root_hash=blake2s):
+    objective = objective or mvs_objective()
+    nodes = zigzag.nodes(zigzag.sector_size())
+    path_length = MerkleTree.tree_height(nodes) - 1
+
+    best = None
+    for levels in range(path_length + 1):
+        hash_function = level_hybrid_hash(leaf_hash, root_hash, levels, nodes)
+        value = objective(with_hash(zigzag, hash_function))
+        if best is None or value < best.value:
+            best = HybridResult(levels, value, hash_function, 0)
+    best.evaluations = path_length + 1
+    return best
+
+################################################################################
+# Batched: optimize every Instance in perf_data.
+
+def perf_data_instances():
+    return [v for v in vars(perf_data).values() if isinstance(v, Instance)]
+
+def _optimize_instance(args):
+    (instance, requirements, partitions) = args
+    zigzag = ZigZag(security=filecoin_security_requirements, instance=instance, partitions=partitions)
+    objective = mvs_objective(requirements)
+    return (optimal_hybrid_ratio(zigzag, objective), optimal_root_levels(zigzag, objective))
+
+# For each instance (default: all of perf_data's), (instance, optimal_hybrid_ratio result, optimal_root_levels result).
+def optimize_instances(instances=None, requirements=filecoin_scaling_requirements, partitions=8, max_workers=None):
+    instances = instances if instances is not None else perf_data_instances()
+    tasks = [(instance, requirements, partitions) for instance in instances]
+    if max_workers == 0:
+        results = list(map(_optimize_instance, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_optimize_instance, tasks))
+    return [(instance,) + result for (instance, result) in zip(instances, results)]
@@ -0,0 +1,200 @@
+"""Ingest rust-fil-proofs `zigzag` example benchmark logs into Instance records.
+
+Logs are read line by line, so arbitrarily large files can be processed. A line invoking the example
+(e.g. `./target/release/examples/zigzag --m 5 --expansion 8 --layers 10 --challenges 333 --size 262144 --groth`)
+starts a new run; `INFO <stat>: <value>` lines (or JSON objects with the same keys) supply its results.
+
+See the comments in perf_data.py for examples of the expected log lines.
+"""
+
+import json
+import re
+import shlex
+from dataclasses import asdict
+from datetime import datetime
+
+from proofs import Instance, Machine, Security, KiB, GiB
+
+stat_keys = ('replication_time', 'replication_time/GiB', 'vanilla_proving_time', 'circuit_num_constraints',
+             'groth_parameter_bytes', 'groth_proving_time')
+
+stat_pattern = re.compile(r'INFO (?P<key>[\w/]+): (?P<value>[\d.]+)')
+timestamp_pattern = re.compile(r'^(?P<timestamp>\w{3}\s+\d+\s+\d\d:\d\d:\d\d(?:\.\d+)?)')
+command_pattern = re.compile(r'examples/zigzag\s')
+
+# Logs carry no year, and differences are all we need. Timestamps are parsed in a leap year, so that Feb 29 is valid
+# (strptime's default year, 1900, is not a leap year).
+log_year = 2000
+
+def parse_timestamp(text):
+    fmt = '%Y %b %d %H:%M:%S.%f' if '.' in text else '%Y %b %d %H:%M:%S'
+    return datetime.strptime(f"{log_year} {' '.join(text.split())}", fmt)
+
+# Seconds from start to end (from parse_timestamp). An end before start is in the next year: the run spanned New Year.
+def elapsed_seconds(start, end):
+    seconds = (end - start).total_seconds()
+    if seconds < 0:
+        seconds += (datetime(log_year + 1, 1, 1) - datetime(log_year, 1, 1)).total_seconds()
+    return seconds
+
+def parse_command(line):
+    """Parse example flags (--m 5 --size 262144 --groth ...) into a dict. Flags without values map to True."""
+    words = shlex.split(line[command_pattern.search(line).start():])
+    flags = {}
+    for (i, word) in enumerate(words):
+        if word.startswith('--'):
+            has_value = i + 1 < len(words) and not words[i + 1].startswith('-')
+            flags[word[2:]] = words[i + 1] if has_value else True
+    return flags
+
+# Generate one dict per run in lines: {'flags': {...}, 'stats': {...}, 'timestamps': {...}}.
+def parse_runs(lines):
+    run = None
+    for line in lines:
+        line = line.strip()
+        if command_pattern.search(line):
+            if run and run['stats']:
+                yield run
+            run = {'flags': parse_command(line), 'stats': {}, 'timestamps': {}}
+            continue
+
+        if line.startswith('{'):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            run = run or {'flags': {}, 'stats': {}, 'timestamps': {}}
+            run['stats'].update({k: float(v) for (k, v) in record.items() if k in stat_keys})
+            continue
+
+        match = stat_pattern.search(line)
+        if match and match.group('key') in stat_keys:
+            run = run or {'flags': {}, 'stats': {}, 'timestamps': {}}
+            key = match.group('key')
+            run['stats'][key] = float(match.group('value'))
+            timestamp = timestamp_pattern.match(line)
+            if timestamp:
+                try:
+                    run['timestamps'][key] = parse_timestamp(timestamp.group('timestamp'))
+                except ValueError:
+                    pass # A malformed timestamp loses only the wall-clock time, not the run.
+
+    if run and run['stats']:
+        yield run
+
+# Wall-clock Groth proving time: from parameter generation/loading finishing until the proof is done.
+def wall_clock_proving_time(run):
+    timestamps = run['timestamps']
+    if 'groth_parameter_bytes' in timestamps and 'groth_proving_time' in timestamps:
+        return elapsed_seconds(timestamps['groth_parameter_bytes'], timestamps['groth_proving_time'])
+
+def run_record(run, machine, description, source=None):
+    flags, stats = run['flags'], run['stats']
+    layers = int(flags.get('layers', 10))
+    sector_size = int(flags['size']) * KiB if 'size' in flags else None # --size is in KiB
+
+    if 'replication_time/GiB' in stats:
+        replication_time_per_GiB = stats['replication_time/GiB']
+    elif 'replication_time' in stats and sector_size:
+        replication_time_per_GiB = stats['replication_time'] / (sector_size / GiB)
+    else:
+        replication_time_per_GiB = None
+
+    wall_clock = wall_clock_proving_time(run)
+    # Core-seconds, assuming proving saturates all cores. Fall back to the reported time if timestamps are missing.
+    if wall_clock is not None and wall_clock > 0 and machine.cores:
+        groth_proving_time = wall_clock * machine.cores
+    else:
+        groth_proving_time = stats.get('groth_proving_time')
+
+    return {'description': description,
+            'source': source,
+            'sector_size': sector_size,
+            'encoding_replication_time_per_GiB': replication_time_per_GiB,
+            'constraints': stats.get('circuit_num_constraints'),
+            'groth_proving_time': groth_proving_time,
+            'groth_parameter_bytes': stats.get('groth_parameter_bytes'),
+            'vanilla_proving_time': stats.get('vanilla_proving_time', 0),
+            'layers': layers,
+            'base_degree': int(flags.get('m', 5)),
+            'expansion_degree': int(flags.get('expansion', 8)),
+            'challenges': int(flags.get('challenges', 1)),
+            'partitions': int(flags.get('partitions', 1)),
+            'taper_layers': int(flags['taper-layers']) if 'taper-layers' in flags else None,
+            'taper': float(flags['taper']) if 'taper' in flags else None,
+            'machine': asdict(machine)}
+
+def record_instance(record):
+    """Build an Instance from a catalog record, or return None if the record is incomplete."""
+    required = ('sector_size', 'encoding_replication_time_per_GiB', 'constraints', 'groth_proving_time')
+    if any(record.get(k) is None for k in required):
+        return None
+    # --challenges is per layer, tapered over the last --taper-layers layers.
+    security = Security(base_degree=record['base_degree'], expansion_degree=record['expansion_degree'],
+                        layers=record['layers'], challenges=record['challenges'], taper=record.get('taper') or 0,
+                        taper_layers=record.get('taper_layers') or 0)
+    return Instance(description=record['description'],
+                    encoding_replication_time_per_GiB=record['encoding_replication_time_per_GiB'],
+                    sector_size=record['sector_size'],
+                    constraints=int(record['constraints']),
+                    groth_proving_time=record['groth_proving_time'],
+                    vanilla_proving_time=record['vanilla_proving_time'],
+                    layers=record['layers'],
+                    security=security,
+                    partitions=record.get('partitions') or 1,
+                    machine=Machine(**record['machine']))
+
+class Catalog:
+    """Catalog of benchmark records, persisted as JSON lines. find() may filter on any field; indexed_fields are fast."""
+    indexed_fields = ('description', 'sector_size', 'challenges', 'partitions', 'source')
+
+    def __init__(self, path=None):
+        self.path = path
+        self.records = []
+        self.index = {} # (field, value) -> list of record positions
+        if path:
+            try:
+                with open(path) as f:
+                    for line in f:
+                        if line.strip():
+                            self._add(json.loads(line))
+            except FileNotFoundError:
+                pass
+
+    def _add(self, record):
+        position = len(self.records)
+        self.records.append(record)
+        for field in self.indexed_fields:
+            self.index.setdefault((field, record.get(field)), []).append(position)
+
+    def add(self, record):
+        self._add(record)
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def ingest(self, path, machine, description=None):
+        """Ingest every run in the log file at path. Returns the number of runs added."""
+        count = 0
+        with open(path) as f:
+            for run in parse_runs(f):
+                self.add(run_record(run, machine, description or str(path), source=str(path)))
+                count += 1
+        return count
+
+    def find(self, **criteria):
+        indexed = [k for k in criteria if k in self.indexed_fields]
+        if indexed:
+            positions = set(self.index.get((indexed[0], criteria[indexed[0]]), []))
+            for k in indexed[1:]:
+                positions &= set(self.index.get((k, criteria[k]), []))
+            candidates = [self.records[i] for i in sorted(positions)]
+        else:
+            candidates = self.records
+        return [r for r in candidates if all(r.get(k) == v for (k, v) in criteria.items())]
+
+    def instances(self, **criteria):
+        return [i for i in map(record_instance, self.find(**criteria)) if i is not None]
+
+    def __len__(self):
+        return len(self.records)
@@ -0,0 +1,82 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# Bytes read and written per 2-to-1 hash: two child nodes in, one node out.
+def bytes_per_hash(node_size):
+    return 3 * node_size
+
+# Hashes at each level of a tree built over nodes leaves, from the leaves up: level 1 hashes pairs of leaves, and the
+# last level produces the root. The top (apex_height - 1) levels are not hashed when an apex is used.
+def level_hash_counts(nodes, apex_height=0):
+    levels = math.ceil(math.log2(nodes))
+    counts = np.ceil(nodes / 2.0 ** np.arange(1, levels + 1))
+    if apex_height > 1:
+        counts = counts[:levels - (apex_height - 1)]
+    return counts
+
+# Per-level hash functions for a tree whose top root_levels levels use root_hash and the rest leaf_hash.
+def level_hybrid(leaf_hash, root_hash, root_levels, levels):
+    return [leaf_hash] * (levels - root_levels) + [root_hash] * min(root_levels, levels)
+
+@dataclass
+class MerkleCost:
+    """Cost of building `trees` Merkle trees, level by level."""
+    trees: int
+    concurrent_trees: int # trees built at once, sharing the machine's cores and memory bandwidth
+    level_hashes: np.ndarray # per tree
+    level_core_seconds: np.ndarray # per tree
+    level_wall_clock: np.ndarray # per tree, given cores and bandwidth available to it
+    level_memory_bound: np.ndarray # True where a level is limited by memory bandwidth, not hashing
+
+    def core_seconds(self):
+        return self.trees * self.level_core_seconds.sum()
+
+    def tree_wall_clock(self):
+        return self.level_wall_clock.sum()
+
+    def wall_clock(self):
+        return math.ceil(self.trees / self.concurrent_trees) * self.tree_wall_clock()
+
+    def parallel_speedup(self):
+        return self.core_seconds() / self.wall_clock()
+
+# Cost of building one tree with cores and memory bandwidth (bytes/second, None for unlimited). Levels are built in
+# sequence; the hashes within a level are independent, so a level can use at most as many cores as it has hashes.
+def _levels(nodes, hash_functions, node_size, apex_height, cores, bandwidth):
+    counts = level_hash_counts(nodes, apex_height)
+    if not isinstance(hash_functions, (list, tuple)):
+        hash_functions = [hash_functions] * len(counts)
+    hash_times = np.array([h.time() for h in hash_functions[:len(counts)]])
+
+    core_seconds = counts * hash_times
+    compute_time = core_seconds / np.minimum(cores, counts)
+    if bandwidth:
+        memory_time = counts * bytes_per_hash(node_size) / bandwidth
+    else:
+        memory_time = np.zeros_like(compute_time)
+    return (counts, core_seconds, np.maximum(compute_time, memory_time), memory_time > compute_time)
+
+# Cost of building `trees` Merkle trees of `nodes` leaves on machine. hash_functions is a HashFunction, or a list of them
+# per level from the leaves up (see level_hybrid). Trees are built concurrently in groups of at most one per core; the
+# group size minimizing wall-clock time is chosen.
+def merkle_cost(nodes, hash_functions, machine, trees=1, node_size=32, apex_height=0):
+    cores = machine.cores or 1
+    bandwidth = machine.memory_bandwidth_gb * 10**9 if machine.memory_bandwidth_gb else None
+
+    best = None
+    for concurrent in range(1, min(trees, cores) + 1):
+        levels = _levels(nodes, hash_functions, node_size, apex_height, cores / concurrent,
+                         bandwidth / concurrent if bandwidth else None)
+        cost = MerkleCost(trees, concurrent, *levels)
+        if best is None or cost.wall_clock() < best.wall_clock():
+            best = cost
+    return best
+
+# Cost of building all of zigzag's trees (one per layer, plus one for the data) for its sector size.
+def zigzag_merkle_cost(zigzag, machine=None, hash_functions=None):
+    machine = machine or zigzag.instance.machine
+    nodes = zigzag.nodes(zigzag.sector_size())
+    return merkle_cost(nodes, hash_functions or zigzag.merkle_hash, machine, trees=zigzag.security.layers + 1,
+                       node_size=zigzag.node_size, apex_height=zigzag.apex_height)
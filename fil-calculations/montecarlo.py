@@ -0,0 +1,154 @@
+"""Monte Carlo uncertainty propagation through the ZigZag model.
+
+Inputs are given as distributions over model fields, named by dotted paths from the ZigZag:
+
+    distributions = {'instance.encoding_replication_time_per_GiB': LogNormal(2018, 0.2),
+                     'instance.merkle_tree_hash.hash_time': Triangular(1.5e-5, 1.8e-5, 2.5e-5),
+                     'instance.groth_acceleration': Uniform(1, 4)}
+    result = simulate(filecoin_zigzag, distributions, samples=10**6)
+    result.percentiles()['minimum_viable_sector_size']
+    result.probability_meets()
+
+A batch of samples is evaluated in one pass: sampled fields are set to arrays, and the model's arithmetic (which is
+plain Python and NumPy) yields arrays of results. Minimum viable sector size uses the closed form of
+solver.minimum_viable_size_array, so it requires an instance.
+"""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+import solver
+from proofs import GiB, filecoin_scaling_requirements, with_field
+
+################################################################################
+# Distributions: each samples n values from a numpy RandomState.
+
+@dataclass(frozen=True)
+class Normal:
+    mean: float
+    sd: float
+
+    def sample(self, rng, n):
+        return rng.normal(self.mean, self.sd, n)
+
+@dataclass(frozen=True)
+class LogNormal:
+    """Median, and sigma of the underlying normal: LogNormal(x, 0.2) is x within about ±20%."""
+    median: float
+    sigma: float
+
+    def sample(self, rng, n):
+        return self.median * rng.lognormal(0, self.sigma, n)
+
+@dataclass(frozen=True)
+class Uniform:
+    low: float
+    high: float
+
+    def sample(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+@dataclass(frozen=True)
+class Triangular:
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng, n):
+        return rng.triangular(self.low, self.mode, self.high, n)
+
+################################################################################
+
+# Fields only used without an instance (whose benchmark replaces them): sampling them has no effect when there is one.
+ignored_with_instance = ('merkle_pessimization', 'kdf_hash.hash_time', 'security.sloth_iter')
+
+metric_names = ('total_seal_time', 'seal_time_per_GiB', 'proof_size', 'meets_requirements',
+                'minimum_viable_sector_size')
+
+# Metrics for zigzag (whose fields may be arrays of n samples) at size, as arrays of length n.
+def evaluate(zigzag, n, requirements=filecoin_scaling_requirements, size=None):
+    size = size or zigzag.sector_size()
+    broadcast = lambda x: np.broadcast_to(np.asarray(x, dtype=np.float64), (n,))
+
+    total_seal_time = broadcast(zigzag.total_seal_time(size))
+    seal_time_per_GiB = total_seal_time * (GiB / size) / broadcast(zigzag.relax_time)
+    proof_size = broadcast(zigzag.proof_size())
+    machine = zigzag.instance.machine if zigzag.instance else None
+    clock = broadcast(machine.clock_speed_ghz if machine else requirements.clock_speed_ghz)
+    meets = (seal_time_per_GiB * clock * 10**9 <= requirements.total_seal_cycles()) & \
+            (proof_size * (GiB / size) <= requirements.proof_size)
+
+    if zigzag.instance:
+        (a, b) = solver.seal_time_coefficients(zigzag)
+        mvs = solver.minimum_viable_size_array(broadcast(a), broadcast(b), clock, broadcast(zigzag.relax_time),
+                                               proof_size, requirements.total_seal_cycles(),
+                                               float(requirements.proof_size))
+    else:
+        mvs = np.full(n, np.nan)
+
+    return {'total_seal_time': total_seal_time, 'seal_time_per_GiB': seal_time_per_GiB, 'proof_size': proof_size,
+            'meets_requirements': meets.astype(np.float64), 'minimum_viable_sector_size': mvs}
+
+def _evaluate_batch(args):
+    (zigzag, distributions, n, seed, requirements, size) = args
+    rng = np.random.RandomState(seed)
+    for (path, distribution) in distributions.items():
+        zigzag = with_field(zigzag, path, distribution.sample(rng, n))
+    return evaluate(zigzag, n, requirements, size)
+
+@dataclass
+class MonteCarloResult:
+    samples: dict # metric name -> array, one value per sample
+
+    def __len__(self):
+        return len(self.samples['total_seal_time'])
+
+    # metric name -> percentiles (ignoring infeasible, nan, sizes).
+    def percentiles(self, q=(5, 50, 95)):
+        return {name: np.nanpercentile(values, q) if not np.all(np.isnan(values)) else np.full(len(q), np.nan)
+                for (name, values) in self.samples.items() if name != 'meets_requirements'}
+
+    # Probability of meeting the requirements at the evaluated sector size.
+    def probability_meets(self):
+        return float(np.mean(self.samples['meets_requirements']))
+
+    # Probability that some sector size no larger than size meets the requirements.
+    def probability_viable_at(self, size):
+        mvs = self.samples['minimum_viable_sector_size']
+        return float(np.mean(~np.isnan(mvs) & (mvs <= size)))
+
+# Propagate distributions (dotted field path -> distribution) through zigzag, in batches of batch_size samples.
+# Batches are evaluated in a process pool when max_workers is not 0 (None: one worker per CPU). Distributions of fields
+# in ignored_with_instance are skipped, with a warning, when zigzag has an instance.
+def simulate(zigzag, distributions, samples=10**5, requirements=filecoin_scaling_requirements, size=None, seed=None,
+             batch_size=10**5, max_workers=0):
+    if zigzag.instance:
+        ignored = [path for path in distributions if path in ignored_with_instance]
+        if ignored:
+            warnings.warn(f"not sampling {', '.join(ignored)}: unused by a model with an instance")
+            distributions = {path: d for (path, d) in distributions.items() if path not in ignored}
+    counts = [batch_size] * (samples // batch_size) + ([samples % batch_size] if samples % batch_size else [])
+    # One seed per batch, derived from seed, so results do not depend on how batches are spread over workers.
+    seeds = np.random.RandomState(seed).randint(0, 2**31 - 1, size=len(counts))
+    tasks = [(zigzag, distributions, n, s, requirements, size) for (n, s) in zip(counts, seeds)]
+
+    if max_workers == 0:
+        batches = map(_evaluate_batch, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        batches = executor.map(_evaluate_batch, tasks)
+
+    results = {name: [] for name in metric_names}
+    try:
+        for batch in batches:
+            for name in metric_names:
+                results[name].append(batch[name])
+    finally:
+        if max_workers != 0:
+            executor.shutdown()
+
+    return MonteCarloResult({name: np.concatenate(values) if values else np.empty(0)
+                             for (name, values) in results.items()})
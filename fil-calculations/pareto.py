@@ -0,0 +1,111 @@
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+from perf_data import filecoin_zigzag
+from proofs import GiB, constraint_ram
+from sweep import make_zigzag
+
+objective_names = ('seal_time', 'proof_size', 'groth_proving_memory', 'replicate_energy')
+
+# Objectives (all minimized) for zigzag at each of sizes, as an array of shape (len(sizes), 4):
+#  - seal_time: core-seconds per GiB, as in ZigZag.performance
+#  - proof_size: bytes per GiB, as in ZigZag.performance
+#  - groth_proving_memory: bytes of RAM to prove one partition, as in ZigZag.groth_proving_memory
+#  - replicate_energy: Wh per GiB, as in ZigZag.replicate_energy (from replication_time)
+def objectives(zigzag, sizes):
+    sizes = np.asarray(sizes, dtype=np.float64)
+    scale = GiB / sizes
+    seal_time = scale * zigzag.total_seal_time_array(sizes) / zigzag.relax_time
+    proof_size = scale * zigzag.proof_size()
+    if zigzag.instance:
+        constraints = np.full(sizes.shape, float(zigzag.constraints()))
+    else:
+        constraints = zigzag.hashing_constraints_array(sizes)
+    memory = constraints * constraint_ram
+    energy = scale * (zigzag.replication_time_array(sizes) / 3600) * zigzag.core_power()
+    return np.column_stack((seal_time, proof_size, memory, energy))
+
+# Boolean mask of the rows of values (one row per point, one column per objective) not dominated by any other row.
+def pareto_mask(values):
+    values = np.asarray(values)
+    mask = np.ones(len(values), dtype=bool)
+    for (i, v) in enumerate(values):
+        if not mask[i]:
+            continue
+        # Rows dominated by v can never be on the front.
+        dominated = np.all(v <= values, axis=1) & np.any(v < values, axis=1)
+        mask[dominated] = False
+    return mask
+
+@dataclass(frozen=True)
+class FrontierPoint:
+    zigzag: object
+    sector_size: int
+    objectives: tuple # in the order of objective_names
+
+@dataclass
+class Frontier:
+    points: list
+    configurations: int # configurations considered
+    pruned: int # configurations skipped, as no size of them can be on the front
+
+    def values(self):
+        return np.array([p.objectives for p in self.points])
+
+# Find the Pareto front over objective_names for every combination of axes (as in sweep.sweep) and sector size.
+#
+# Each configuration has an ideal point: the best value of each objective over all its sizes. If a known front point is
+# at least as good as that ideal point in every objective, no size of the configuration can be on the front, and it is
+# skipped. Configurations are visited in order of their ideal points, so that good front points are found early.
+#
+# With an instance, sector size is fixed by the instance, and sizes only scale the per-GiB objectives: seal time is
+# a * size + b with b >= 0 and proof size is constant, so per GiB both fall with size, while proving memory is constant
+# and energy per GiB (from replication time, linear in size) is too. The ideal point is then found at the smallest or
+# largest size, and interior sizes are only evaluated for configurations which are not skipped. Without an instance,
+# the objectives need not be monotone in size (apex and tree height terms do not scale with it), so every size is
+# evaluated to find the ideal point, and skipping only saves merging the configuration into the front.
+def frontier(axes, *, base=filecoin_zigzag, sizes=None, security_requirements=None):
+    sizes = np.asarray(sizes if sizes is not None else [2**k for k in range(30, 41)], dtype=np.float64)
+    endpoints = sizes[[0, -1]]
+
+    names = list(axes)
+    candidates = []
+    for values in itertools.product(*axes.values()):
+        zigzag = make_zigzag(dict(zip(names, values)), base)
+        if security_requirements and not security_requirements.satisfied_by(zigzag.security):
+            continue
+        if zigzag.instance:
+            (ideal, values) = (objectives(zigzag, endpoints).min(axis=0), None)
+        else:
+            values = objectives(zigzag, sizes)
+            ideal = values.min(axis=0)
+        candidates.append((ideal, zigzag, values))
+
+    if not candidates:
+        return Frontier([], 0, 0)
+
+    # Visit in order of normalized ideal points.
+    ideals = np.array([ideal for (ideal, _, _) in candidates])
+    span = np.where(ideals.max(axis=0) > ideals.min(axis=0), ideals.max(axis=0) - ideals.min(axis=0), 1)
+    order = np.argsort(((ideals - ideals.min(axis=0)) / span).sum(axis=1))
+
+    front_values = np.empty((0, len(objective_names)))
+    front_points = []
+    pruned = 0
+    for i in order:
+        (ideal, zigzag, values) = candidates[i]
+        if len(front_values) and np.any(np.all(front_values <= ideal, axis=1)):
+            pruned += 1
+            continue
+
+        if values is None:
+            values = objectives(zigzag, sizes)
+        all_values = np.concatenate((front_values, values))
+        all_points = front_points + [FrontierPoint(zigzag, int(size), tuple(v)) for (size, v) in zip(sizes, values)]
+        mask = pareto_mask(all_values)
+        front_values = all_values[mask]
+        front_points = list(itertools.compress(all_points, mask))
+
+    return Frontier(front_points, len(candidates), pruned)
@@ -0,0 +1,76 @@
+import math
+from dataclasses import dataclass, replace
+
+import calibration
+from proofs import GiB, replace_security
+
+# serial_fraction is the fraction of a partition's Groth proving which does not parallelize across cores. Proving one
+# partition on c cores takes work * (serial_fraction + (1 - serial_fraction) / c), so running partitions concurrently
+# on fewer cores each can finish sooner than running them one at a time on all cores. Unless given, it comes from the
+# calibrated proving time model (calibration.ProvingTimeModel.serial_fraction) at each partition's constraints.
+
+# zigzag, split into partitions circuits. An Instance's constraints and challenges are per partition, and its
+# groth_proving_time is the total over all of its partitions: splitting the same challenges into more partitions shrinks
+# each circuit but leaves total proving work unchanged. So the instance is re-expressed as the same benchmark split into
+# partitions circuits, with its constraints, challenges and partitions changed together.
+def with_partitions(zigzag, partitions):
+    instance = zigzag.instance
+    if not instance:
+        return replace(zigzag, partitions=partitions)
+    if partitions != instance.partitions:
+        constraints = math.ceil(instance.constraints * instance.partitions / partitions) # the largest circuit
+        challenges = instance.security.total_challenges * instance.partitions / partitions
+        security = replace_security(instance.security, total_challenges=challenges)
+        instance = replace(instance, constraints=constraints, security=security, partitions=partitions)
+    return replace(zigzag, instance=instance, partitions=partitions, size=None)
+
+@dataclass
+class PartitionPlan:
+    partitions: int
+    concurrent_partitions: int
+    memory_per_partition: float # bytes
+    peak_memory: float # bytes
+    proving_wall_clock: float # seconds
+    proof_size: int # bytes
+    extra_proof_size: int # bytes, over a single partition
+
+# Wall-clock seconds to prove partitions partitions of total_work core-seconds, concurrent at a time on cores cores.
+def proving_wall_clock(total_work, partitions, concurrent, cores, serial_fraction):
+    work = total_work / partitions
+    cores_each = max(cores / concurrent, 1)
+    return math.ceil(partitions / concurrent) * work * (serial_fraction + (1 - serial_fraction) / cores_each)
+
+# All plans for proving zigzag on machine (default: the instance's) which fit in ram_fraction of its RAM, for each
+# partition count in candidates (default: powers of two up to 64, and zigzag's own).
+def partition_plans(zigzag, machine=None, candidates=None, ram_fraction=1.0, serial_fraction=None):
+    model = calibration.calibrate() if serial_fraction is None else None
+    machine = machine or zigzag.instance.machine
+    assert machine.ram_gb, "machine.ram_gb required"
+    ram = machine.ram_gb * GiB * ram_fraction
+    cores = machine.cores or 1
+    candidates = sorted(set(candidates or [2**k for k in range(7)] + [zigzag.partitions]))
+    single_proof_size = with_partitions(zigzag, 1).proof_size()
+
+    plans = []
+    for partitions in candidates:
+        partitioned = with_partitions(zigzag, partitions)
+        memory = partitioned.groth_proving_memory()
+        max_concurrent = min(int(ram // memory), partitions, cores) if memory > 0 else min(partitions, cores)
+        total_work = partitioned.groth_proving_time()
+        serial = model.serial_fraction(partitioned.constraints()) if model else serial_fraction
+        for concurrent in range(1, max_concurrent + 1):
+            plans.append(PartitionPlan(partitions, concurrent, memory, memory * concurrent,
+                                       proving_wall_clock(total_work, partitions, concurrent, cores, serial),
+                                       partitioned.proof_size(), partitioned.proof_size() - single_proof_size))
+    return plans
+
+# The plan minimizing proving wall-clock time (then proof size) which fits in RAM, and whose proof is no larger than
+# max_proof_size (if given), or None if there is none.
+def plan_partitions(zigzag, machine=None, candidates=None, ram_fraction=1.0, serial_fraction=None,
+                    max_proof_size=None):
+    plans = partition_plans(zigzag, machine, candidates, ram_fraction, serial_fraction)
+    if max_proof_size is not None:
+        plans = [plan for plan in plans if plan.proof_size <= max_proof_size]
+    if not plans:
+        return None
+    return min(plans, key=lambda plan: (plan.proving_wall_clock, plan.proof_size, plan.concurrent_partitions))
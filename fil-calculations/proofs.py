@@ -8,9 +8,13 @@ Based on @nicola's ZigZag calculator: https://observablehq.com/d/51563fc39810b60
 
 import math
 import copy
+import warnings
 from dataclasses import dataclass, replace
 
-from util import humanize_bytes, humanize_seconds
+import numpy as np
+
+from cache import hash_once, memoized
+from util import humanize_bytes, humanize_seconds, lazy_attributes
 
 KiB = 1024
 MiB = 1024 * KiB
@@ -28,7 +32,11 @@ constraint_proving_time = ((2.785 * 60 * 6) / 16e6) * 4/5 # 4/5 because 4GHz ben
 # bytes required to prove: bytes per constraint
 constraint_ram = 23.1 * GiB / 16e6
 
-@dataclass
+# Model dataclasses are frozen, so they are hashable (and can be cache keys; see cache.hash_once) and safe to share
+# without copying. Use dataclasses.replace to derive new models. Derived attributes are computed once, in __post_init__.
+
+@hash_once
+@dataclass(frozen=True)
 class Performance:
     """Performance model, defining time and proof size to securely seal 1GiB."""
     # TODO: rename total_seal_time in notebooks, to disambiguate from ZigZag.total_seal_time and make clear that this
@@ -38,7 +46,7 @@ class Performance:
     clock_speed_ghz: float
 
     def __post_init__(self):
-        self.proof_size = self.proof_bytes # per gigabyte
+        object.__setattr__(self, 'proof_size', self.proof_bytes) # per gigabyte
 
     def total_seal_cycles(self):
         return self.total_seal_time * self.clock_speed_ghz * (10**9)
@@ -51,6 +59,27 @@ class Performance:
     def satisfied_by(self, other):
         return (other.total_seal_cycles() <= self.total_seal_cycles()) and (other.proof_size <= self.proof_size)
 
+@dataclass
+class PerformanceArray:
+    """Performance of one ZigZag evaluated over an array of sector sizes. Per-GiB fields mirror Performance."""
+    sizes: np.ndarray # bytes
+    replication_time: np.ndarray # core-seconds per sector
+    total_proving_time: np.ndarray # core-seconds per sector
+    total_seal_time: np.ndarray # core-seconds per gigabyte
+    proof_size: np.ndarray # per gigabyte
+    clock_speed_ghz: float
+
+    def total_seal_cycles(self):
+        return self.total_seal_time * self.clock_speed_ghz * (10**9)
+
+    def performance(self, i):
+        return Performance(self.total_seal_time[i], self.proof_size[i], self.clock_speed_ghz)
+
+    # Boolean mask: which sizes have performance satisfying required_performance?
+    def satisfies(self, required_performance):
+        return (self.total_seal_cycles() <= required_performance.total_seal_cycles()) & \
+               (self.proof_size <= required_performance.proof_size)
+
 
 # Factor by which to relax the CPU time requirement for experiments.
 global_time_relaxation = 1
@@ -61,24 +90,77 @@ bad_performance = Performance(100000000000, 99999999, 1.1)
 assert filecoin_scaling_requirements.satisfied_by(good_performance)
 assert not filecoin_scaling_requirements.satisfied_by(bad_performance)
 
-@dataclass
+# Challenges for each layer, first to last: challenges on every layer, except the last taper_layers, whose challenges
+# shrink by a factor of (1 - taper) per layer. As in the zigzag example's --challenges, --taper and --taper-layers.
+def tapered_challenges(challenges, layers, taper=0, taper_layers=0):
+    assert taper_layers <= layers, f"cannot taper the last {taper_layers} of {layers} layers"
+    tapered = np.ceil(challenges * (1 - taper) ** np.arange(1, taper_layers + 1))
+    return np.concatenate((np.full(layers - taper_layers, float(challenges)), tapered))
+
+@hash_once
+@dataclass(frozen=True)
 class Security:
     base_degree: int
     expansion_degree: int
     layers: int
-    total_challenges: int
+    total_challenges: int=None # Derived from the taper schedule when challenges is given (any value given is ignored).
     sloth_iter: int=0
+    challenges: int=None # per (untapered) layer
+    taper: float=0
+    taper_layers: int=0
+
+    def __post_init__(self):
+        if self.challenges is not None:
+            total_challenges = float(self.challenge_schedule().sum())
+            if self.total_challenges is not None and not np.all(np.isclose(self.total_challenges, total_challenges)):
+                warnings.warn(f"total_challenges {self.total_challenges} ignored: the challenge schedule gives "
+                              f"{total_challenges}. Use replace_security to change total_challenges.", stacklevel=3)
+            object.__setattr__(self, 'total_challenges', total_challenges)
+        assert self.total_challenges is not None, "total_challenges or challenges required"
+
+    # Challenges for each layer. Without a taper schedule, total_challenges is spread evenly over the layers.
+    def challenge_schedule(self):
+        if self.challenges is None:
+            return np.full(self.layers, self.total_challenges / self.layers)
+        return tapered_challenges(self.challenges, self.layers, self.taper, self.taper_layers)
 
     def satisfied_by(self, other):
         return (other.base_degree >= self.base_degree) and (other.expansion_degree >= self.expansion_degree) \
             and (other.layers >= self.layers) and (other.sloth_iter >= self.sloth_iter) \
             and (other.total_challenges >= self.total_challenges)
 
+# security with changes. A total_challenges derived from a challenge schedule (including one set by changes, as a
+# sweep over challenges does) is derived again; changing total_challenges alone (as sensitivity.py and montecarlo.py
+# do, perhaps to an array) replaces the schedule with total_challenges spread evenly over the layers.
+schedule_fields = ('challenges', 'taper', 'taper_layers')
+
+def replace_security(security, **changes):
+    if 'total_challenges' not in changes:
+        if changes.get('challenges', security.challenges) is not None:
+            changes['total_challenges'] = None
+    elif security.challenges is not None and not any(name in changes for name in schedule_fields):
+        changes['challenges'] = None
+    return replace(security, **changes)
+
+# model (a ZigZag, or any of its fields), with the field at dotted path (e.g. 'instance.machine.clock_speed_ghz') set to
+# value. Securities are replaced with replace_security.
+def with_field(model, path, value):
+    (name, _, rest) = path.partition('.')
+    if rest:
+        value = with_field(getattr(model, name), rest, value)
+    changes = {name: value}
+    if isinstance(model, ZigZag) and model.instance:
+        changes['size'] = None # Illegal to pass with an instance, so let it default.
+    if isinstance(model, Security):
+        return replace_security(model, **changes)
+    return replace(model, **changes)
+
 # FIXME: What is the exact real number of challenges?
 filecoin_security_requirements = Security(base_degree=5, expansion_degree=8, layers=10, sloth_iter=0,
                                           total_challenges=8848)
 
-@dataclass
+@hash_once
+@dataclass(frozen=True)
 class HashFunction:
     ## For now, assume 64 byte input, 32 byte output
     hash_time: float
@@ -110,7 +192,8 @@ blake2s = HashFunction(1.0428e-7, 10324)
 
 pb50 = hybrid_hash(pedersen, blake2s, 0.5)
 
-@dataclass
+@hash_once
+@dataclass(frozen=True)
 class MerkleTree:
     nodes: int
     hash_function: HashFunction
@@ -118,15 +201,19 @@ class MerkleTree:
 
     def __post_init__(self):
         assert self.apex_height != 1, "apex_height of 1 is undefined"
-        self.height = self.tree_height(self.nodes)
+        object.__setattr__(self, 'height', self.tree_height(self.nodes))
 
     def apex_leaves(self):
         return 2 ** (self.apex_height - 1)
 
+    # Hashes of the apex, which are not computed: apex_leaves - 1. apex_height may be an array.
+    @staticmethod
+    def apex_count(apex_height):
+        return 2.0 ** (apex_height - 1) - 1
+
     # Hashes required to build tree.
     def hash_count(self):
-        apex_count = self.apex_leaves() - 1
-        return (self.nodes - 1) - apex_count
+        return (self.nodes - 1) - self.apex_count(self.apex_height)
 
     # Assuming no parallelism
     def time(self):
@@ -148,16 +235,27 @@ class MerkleTree:
     def tree_height(leaves):
         return math.ceil(math.log2(leaves)) + 1
 
-@dataclass
+    @staticmethod
+    def tree_height_array(leaves):
+        return np.ceil(np.log2(leaves)) + 1
+
+@hash_once
+@dataclass(frozen=True)
 class Machine:
     """Machine Model"""
     clock_speed_ghz: float
     ram_gb: float=None # Gib
     cores: int=None
     hourly_cost: float=None
-
-# TODO: Make it so this can be extracted directly (and correctly) from the JSON results of the zigzag example.
-@dataclass
+    memory_bandwidth_gb: float=None # GB/s
+    # Storage, for storage.seal_io. None means unlimited.
+    disk_throughput_gb: float=None # GB/s, sequential
+    disk_iops: float=None # random node-sized reads per second
+    ram_cache_gb: float=None # GiB of RAM for caching layers and trees; defaults to ram_gb
+
+# Instances can be extracted from zigzag example logs and JSON results with ingest.Catalog.
+@hash_once
+@dataclass(frozen=True)
 class Instance:
     encoding_replication_time_per_GiB: int
     sector_size: int
@@ -170,29 +268,41 @@ class Instance:
     vanilla_proving_time: float=0
     security: Security=filecoin_security_requirements
     groth_acceleration: int=1.0 # Projected improvements to proving time.
+    partitions: int=1 # Circuits proved, each of constraints; groth_proving_time is for all of them.
     """Concrete implementations with known benchmarks of fixed parameters on a specific machine."""
 
     def __post_init__(self):
-        self.proving_time_per_constraint = self.groth_proving_time / self.constraints
+        object.__setattr__(self, 'proving_time_per_constraint', self.groth_proving_time / self.constraints)
         assert self.constraints, "constraints required"
         return self
 
+    @memoized
     def merkle_tree_replication_time_per_GiB(self):
+        return self.merkle_tree_time_per_GiB(self.merkle_tree_hash, self.layers)
+
+    # Time to build the trees (without apex) of a GiB replicated with layers: one per layer, plus one for the data.
+    @staticmethod
+    def merkle_tree_time_per_GiB(merkle_tree_hash, layers):
         # FIXME: Don't hard-code 32.
-        return MerkleTree(GiB / 32, self.merkle_tree_hash).time() * (self.layers + 1)  # Grrr... layers doesn't really
+        return MerkleTree(GiB / 32, merkle_tree_hash).time() * (layers + 1)  # Grrr... layers doesn't really
         # belong in Instance, but we need it here. Move to ZigZag in refactor.
 
+    @memoized
     def replication_time_per_GiB(self):
         return self.encoding_replication_time_per_GiB + self.merkle_tree_replication_time_per_GiB()
 
-    def scale(self, constraints, new_merkle_hash):
+    # security and partitions, if given, are those of the new constraints.
+    def scale(self, constraints, new_merkle_hash, security=None, partitions=None):
         # TODO: mirror more sophisticated constraint calculation for replication time.
         return replace(self,
                        merkle_tree_hash=new_merkle_hash,
                        constraints=constraints,
-                       groth_proving_time=self.proving_time_per_constraint * constraints)
+                       groth_proving_time=self.proving_time_per_constraint * constraints,
+                       security=security or self.security,
+                       partitions=partitions or self.partitions)
 
-@dataclass
+@hash_once
+@dataclass(frozen=True)
 class ZigZag:
     """ZigZag Model"""
 
@@ -213,14 +323,14 @@ class ZigZag:
     constraint_proving_time: int=constraint_proving_time # seconds per constraint
     apex_height: int=0
     def __post_init__(self):
-        self.node_size = self.hash_size
+        object.__setattr__(self, 'node_size', self.hash_size)
         assert (self.node_size == self.hash_size)
         if self.instance:
             # size is only intended for when no instance is present. This should be refactored somehow over time.
             assert not self.size, "size may not be specified when instance is provided."
-            self.size = self.instance.sector_size
+            object.__setattr__(self, 'size', self.instance.sector_size)
         elif not self.size:
-            self.size = GiB
+            object.__setattr__(self, 'size', GiB)
 
         assert math.log2(self.size) % 1 == 0
         return self
@@ -231,6 +341,7 @@ class ZigZag:
     def sector_size(self):
         return self.instance.sector_size if self.instance else self.size
 
+    @memoized
     def merkle_tree(self, size=GiB):
         return MerkleTree(self.nodes(size), self.merkle_hash, apex_height=self.apex_height)
 
@@ -241,7 +352,7 @@ class ZigZag:
     def proof_size(self): return (self.circuit_proof_size * self.partitions) \
                                  + self.comm_d_size() + self.comm_r_size() + self.comm_r_star_size()
 
-    # This can be calculated from taper, etc. later.
+    # Summed over layers, with any taper applied. See Security.challenge_schedule.
     def total_challenges(self): return self.security.total_challenges
 
     def degree(self): return self.security.base_degree + self.security.expansion_degree
@@ -281,7 +392,7 @@ class ZigZag:
         size = size or self.sector_size() # In case None is passed explicitly, which is a pattern used here.
         if self.instance:
             # TODO: This is horrible, but okay since hash time is so small (tiny negative time when no apex at all).
-            apex_merkle_time = ((self.merkle_tree().apex_leaves() - 1) * self.merkle_hash.hash_time) * (self.security.layers + 1)
+            apex_merkle_time = (MerkleTree.apex_count(self.apex_height) * self.merkle_hash.hash_time) * (self.security.layers + 1)
             # Assumes replication time scales linearly with size.
             return (self.instance.replication_time_per_GiB() - (apex_merkle_time * self.merkle_tree().nodes
                                                                 * self.node_size )) * (size / GiB)
@@ -292,21 +403,25 @@ class ZigZag:
     # Energy requirements include processor but not the rest of system
     # (cooling, memory, disk, etc)
 
-    def replicate_energy(self):
+    # processor_power is for the whole processor, but times are in core-seconds: each busy core draws its share.
+    # Without a machine (or an instance's), assume a single core.
+    def core_power(self, machine=None):
+        machine = machine or (self.instance.machine if self.instance else None)
+        return self.processor_power / ((machine and machine.cores) or 1)
+
+    def replicate_energy(self, size=None, machine=None):
         # returns in Wh
-        # Use replicate_max time: even if you parallelize, you're still running
+        # Use total replication time: even if you parallelize, you're still running
         # for this amount of cumulative time across all processors
         # for reference, one BTC transaction uses ~430 kWh
         # one household uses ~10 kWh/year
-        replicate_time_hours = self.replicate_max()/3600
-        return replicate_time_hours*self.processor_power # TODO: processor power belongs im machine. So?
+        replicate_time_hours = self.replication_time(size)/3600
+        return replicate_time_hours*self.core_power(machine) # TODO: processor power belongs im machine. So?
 
-    def snark_energy(self):
+    def snark_energy(self, size=None, machine=None):
         # returns in Wh
-        # Using the non-parallelizable version of constraint estimates
-        # This has to be wrong; is giving GWh/GB
-        snark_time_hours = self.groth_proving_time()/3600
-        return snark_time_hours * self.processor_power
+        snark_time_hours = self.groth_proving_time(size)/3600
+        return snark_time_hours * self.core_power(machine)
     ############################################################################
 
     # Calculate vanilla proving time for data of size.p
@@ -325,11 +440,27 @@ class ZigZag:
             #     "cannot specify a size to groth_proving_time when Instance is present."
             # FIXME: Calculate ratio of constraints for self.sector_size and
             #  size. Use to calculate groth proving time for size.
-            base_time = self.instance.groth_proving_time / self.instance.groth_acceleration
-            total_apex_constraints = (self.net_apex_constraints() * self.partitions)
-            return base_time + total_apex_constraints * self.constraint_proving_time
+            return self.instance_groth_proving_time(self.instance.groth_proving_time, self.instance.groth_acceleration,
+                                                    self.instance.constraints, self.instance.partitions,
+                                                    self.security_constraints(), self.net_apex_constraints(),
+                                                    self.partitions, self.constraint_proving_time)
         else:
-            return self.constraints(size) * (0.01469 / 1000)  # FIXME: don't hard code this.
+            return self.hashing_groth_proving_time(self.constraints(size))
+
+    # groth_proving_time of the instance, scaled for any difference between our challenges and partitions and those it
+    # was benchmarked with (its groth_proving_time is for all of its partitions), plus the apex's constraints.
+    @staticmethod
+    def instance_groth_proving_time(groth_proving_time, groth_acceleration, instance_constraints, instance_partitions,
+                                    security_constraints, net_apex_constraints, partitions, constraint_proving_time):
+        base_time = groth_proving_time / groth_acceleration * (partitions / instance_partitions) \
+                    * (instance_constraints + security_constraints) / instance_constraints
+        total_apex_constraints = (net_apex_constraints * partitions)
+        return base_time + total_apex_constraints * constraint_proving_time
+
+    # groth_proving_time of hashing_constraints, without an instance.
+    @staticmethod
+    def hashing_groth_proving_time(hashing_constraints):
+        return hashing_constraints * (0.01469 / 1000)  # FIXME: don't hard code this.
 
 
     # Calculate total_proving_time for data of `size`
@@ -340,24 +471,58 @@ class ZigZag:
     # Constraints used to verify the commitment to the apex leaves.
     def apex_constraints(self):
         if self.apex_height > 0:
-            # divide by two if we can avoid merkle-damgard TODO: how actually calculate this?
-            return ((self.merkle_tree().apex_leaves() - 1) * self.merkle_hash.constraints) / 2
+            return self.apex_commitment_constraints(MerkleTree.apex_count(self.apex_height), self.merkle_hash.constraints)
         else:
             return 0
 
     def apex_constraints_avoided(self):
         if self.apex_height > 0:
-            return (self.apex_height - 1) * (self.degree() + 2) * self.total_challenges() * self.merkle_hash.constraints \
-                   * self.constraint_proving_time
+            return self.apex_proof_constraints_avoided(self.apex_height, self.degree(), self.total_challenges(),
+                                                       self.merkle_hash.constraints, self.constraint_proving_time)
         else:
             return 0
 
+    @staticmethod
+    def apex_commitment_constraints(apex_count, merkle_constraints):
+        # divide by two if we can avoid merkle-damgard TODO: how actually calculate this?
+        return (apex_count * merkle_constraints) / 2
+
+    @staticmethod
+    def apex_proof_constraints_avoided(apex_height, degree, total_challenges, merkle_constraints,
+                                       constraint_proving_time):
+        return (apex_height - 1) * (degree + 2) * total_challenges * merkle_constraints * constraint_proving_time
+
+    @memoized
     def net_apex_constraints(self):
         return self.apex_constraints() - self.apex_constraints_avoided()
 
+    # Constraints added (or, if negative, removed) per partition by using our security parameters and partitions,
+    # rather than the instance's: hashing constraints for the difference between our challenges per partition and
+    # those of each of the instance's partitions.
+    @memoized
+    def security_constraints(self):
+        if not self.instance:
+            return 0
+        extra_challenges = self.total_challenges() / self.partitions - self.instance.security.total_challenges
+        if np.ndim(extra_challenges) == 0 and extra_challenges == 0:
+            return 0 # The common case: skip building a merkle tree.
+        return self.challenge_constraints(self.hashing_constraints_per_challenge(), self.total_challenges(),
+                                          self.partitions, self.instance.constraints,
+                                          self.instance.security.total_challenges)
+
+    # Constraints per partition for proving total_challenges over partitions, rather than the instance_challenges of
+    # each partition of instance_constraints. The instance's circuit cannot have fewer than no hashing constraints, so
+    # per_challenge is capped at its constraints per challenge: where the model's estimate exceeds the benchmark's,
+    # removing challenges would otherwise leave negative constraints. Vectorized, for graph.py and apex.py.
+    @staticmethod
+    def challenge_constraints(per_challenge, total_challenges, partitions, instance_constraints, instance_challenges):
+        per_challenge = np.minimum(per_challenge, instance_constraints / instance_challenges)
+        return per_challenge * (total_challenges / partitions - instance_challenges)
+
+    @memoized
     def constraints(self, size=None):
         if self.instance:
-            non_apex_constraints = self.instance.constraints # * self.partitions
+            non_apex_constraints = self.instance.constraints + self.security_constraints() # * self.partitions
             return non_apex_constraints + self.net_apex_constraints()
         else:
             # NOTE: when no instance, return ONLY hashing constraints — for use in relative calculations.
@@ -367,14 +532,28 @@ class ZigZag:
     def groth_proving_memory(self):
         return self.constraints() * constraint_ram
 
+    # Hashing constraints to prove one challenge (in one layer).
+    def hashing_constraints_per_challenge(self, size=None):
+        merkle_tree = self.merkle_tree(size or self.sector_size())
+        return self.challenge_hashing_constraints(merkle_tree.proof_hashes(), self.degree(),
+                                                  self.merkle_hash.constraints, self.kdf_hash.constraints)
+
+    # Hashing constraints to prove one challenge with proof_hashes merkle hashes per inclusion proof, for a node with
+    # degree parents. Vectorized, for hashing_constraints_array and graph.py.
+    @staticmethod
+    def challenge_hashing_constraints(proof_hashes, degree, merkle_constraints, kdf_constraints):
+        kdf_hashes = (degree + 1) / 2 # From ZigZag calculator.
+        return (proof_hashes * merkle_constraints * (degree + 2)) + (kdf_constraints * kdf_hashes)
+
     # How many hashing constraints due to hashing does the instance's circuit proof have?
     # NOTE: This is not the number of hashes required to build the merkle trees — which happens outside of circuits.
+    @memoized
     def hashing_constraints(self, size=None):
-        parents = self.degree()
-        kdf_hashes = (parents + 1) / 2 # From ZigZag calculator.
-        merkle_tree = self.merkle_tree(size or self.sector_size())
-        return ((merkle_tree.proof_constraints() * (parents + 2)) + (self.kdf_hash.constraints * kdf_hashes)) * \
-               (self.security.total_challenges / self.partitions)
+        return self.hashing_constraints_per_challenge(size) * (self.total_challenges() / self.partitions)
+
+    # hashing_constraints of each layer, following the taper schedule. Sums to hashing_constraints.
+    def hashing_constraints_per_layer(self, size=None):
+        return self.hashing_constraints_per_challenge(size) * self.security.challenge_schedule() / self.partitions
 
     # How many hashing constraints not due to hashing does the instance's circuit proof have?
     def non_hashing_contraints(self):
@@ -385,6 +564,7 @@ class ZigZag:
         return (self.replication_time(effective_size) + self.total_proving_time(effective_size))
 
     # Create a Performance object based on this ZigZag's calculated stats.
+    @memoized
     def performance(self, size=GiB):
         scale = GiB / size
         seal_time =  scale * self.total_seal_time(size) / self.relax_time
@@ -399,53 +579,123 @@ class ZigZag:
     def scaled_for_new_hash(self, new_hash):
         # NOTE: This assumes proof size does not change when changing hash, but depending on number of constraints,
         # that may not be accurate — since we may need to add partitions as parameter and memory requirements grow.
+        # partitions.plan_partitions finds a partition count whose circuits fit in a machine's RAM.
         if self.instance:
             constraint_scale = new_hash.constraints / self.merkle_hash.constraints
             old_hashing_constraints = self.hashing_constraints()
             new_hashing_constraints = old_hashing_constraints * constraint_scale
             new_constraints = self.non_hashing_contraints() + new_hashing_constraints
 
-            scaled_instance = self.instance.scale(new_constraints, new_hash)
+            # The new constraints are for our security parameters and partitions, which the scaled instance now
+            # records: each partition proving its share of our total challenges.
+            security = replace(self.security, total_challenges=self.total_challenges() / self.partitions,
+                               challenges=None, taper=0, taper_layers=0)
+            scaled_instance = self.instance.scale(new_constraints, new_hash, security, self.partitions)
 
         # Set size None so it defaults. Illegal to pass since it might conflict with instance.
             return replace(self, instance=scaled_instance, merkle_hash=new_hash, size=None)
         else:
             assert False, "unimplemented"
 
-    # Find the minimum viable sector size, which must be a power of 2 (assuming the initial guess is).
-    def minimum_viable_sector_size(self, performance_requirements, guess=GiB, iterations_so_far=0,
-                                   max_iterations=20):
-        if guess < 1: return None
-        #TODO: if guess < minimum sector size for proof size: return the minimum. Need to calculate.
-        if iterations_so_far >= max_iterations: return 0
-
-        # If guess is viable, search for a smaller solution, starting with 1/2 the current guess.
-        if self.meets_performance_requirements(guess, performance_requirements):
-            smaller_solution = self.minimum_viable_sector_size(performance_requirements, guess / 2,
-                                               iterations_so_far=iterations_so_far + 1,
-                                               max_iterations=max_iterations)
-            return smaller_solution or guess
-        # Otherwise, a larger one, starting with twice the current guess.
-        else:
-            return self.minimum_viable_sector_size(performance_requirements, guess * 2,
-                                              iterations_so_far = iterations_so_far + 1,
-                                              max_iterations=max_iterations)
+    # Find the minimum viable sector size, which must be a power of 2 (or a multiple of granularity, if given).
+    # Returns None if no sector size meets performance_requirements. See solver.py.
+    @memoized
+    def minimum_viable_sector_size(self, performance_requirements, granularity=None):
+        import solver
+        return solver.minimum_viable_sector_size(self, performance_requirements, granularity).sector_size
 
+    # Minimum viable sector size (humanized) of pedersen/blake2s hybrid_hashes with root fractions 0, 0.1, ... 1.
+    # Returns a list of (root_fraction, MVS). See optimal_hybrid_minimum_viable_sector_size for the best fraction.
     def minimum_viable_sector_size_for_hybrids(self, performance_requirements):
         f = lambda r, n : r *(1/n)
-        scaled = zigzag.scaled_for_new_hash(hybrid_hash(pedersen, blake2s, f(r,10)))
+        scaled = lambda r: self.scaled_for_new_hash(hybrid_hash(pedersen, blake2s, f(r, 10)))
 
-        return [(f(r, 10), humanize_bytes(scaled.minimum_viable_sector_size(performance_requirements)))
+        return [(f(r, 10), humanize_bytes(scaled(r).minimum_viable_sector_size(performance_requirements)))
                 for r in range(0, 11)]
 
+    # Find the pedersen/blake2s hybrid_hash ratio minimizing minimum viable sector size. Returns (root_fraction, MVS).
+    # See hybrid.py for other objectives and per-level hybrids.
+    def optimal_hybrid_minimum_viable_sector_size(self, performance_requirements):
+        import hybrid
+        result = hybrid.optimal_hybrid_ratio(self, hybrid.mvs_objective(performance_requirements))
+        return (result.parameter, self.scaled_for_new_hash(result.hash_function)
+                .minimum_viable_sector_size(performance_requirements))
+
+    ############################################################################
+    # Vectorized equivalents of the per-size methods above. Each takes an array of sector sizes (bytes) and evaluates
+    # every size in one NumPy pass, without constructing a MerkleTree or Performance per size.
+
+    def nodes_array(self, sizes):
+        nodes = np.asarray(sizes, dtype=np.float64) / self.node_size
+        assert np.all((nodes % 1) == 0)
+        return nodes
+
+    def replicate_min_array(self, sizes):
+        nodes = self.nodes_array(sizes)
+        parents = self.security.base_degree + self.security.expansion_degree
+        parents_hashing = ((parents + 1) / 2) * self.kdf_hash.time()
+        kdf_time = parents_hashing * nodes * self.security.layers
+        sloth = self.security.sloth_iter * nodes * self.security.layers
+        return kdf_time + sloth
+
+    def replicate_max_array(self, sizes):
+        nodes = self.nodes_array(sizes)
+        apex_count = MerkleTree.apex_count(self.apex_height)
+        merkle_tree_time = self.merkle_hash.time() * ((nodes - 1) - apex_count)
+        return self.replicate_min_array(sizes) + merkle_tree_time * (self.security.layers + 1) * \
+               self.merkle_pessimization
+
+    def replication_time_array(self, sizes):
+        sizes = np.asarray(sizes, dtype=np.float64)
+        if self.instance:
+            # replication_time is linear in size when an instance is present, so calculate it once per GiB.
+            return self.replication_time(GiB) * (sizes / GiB)
+        else:
+            return self.replicate_max_array(sizes)
+
+    def vanilla_proving_time_array(self, sizes):
+        return np.full(np.shape(sizes), float(self.vanilla_proving_time()))
+
+    def hashing_constraints_array(self, sizes):
+        height = MerkleTree.tree_height_array(self.nodes_array(sizes))
+        proof_hashes = (height - 1) - (self.apex_height - 1)
+        return self.challenge_hashing_constraints(proof_hashes, self.degree(), self.merkle_hash.constraints,
+                                                  self.kdf_hash.constraints) * (self.total_challenges() / self.partitions)
+
+    def groth_proving_time_array(self, sizes):
+        if self.instance:
+            # Instance groth proving time does not (yet) depend on size. See groth_proving_time.
+            return np.full(np.shape(sizes), float(self.groth_proving_time()))
+        else:
+            return self.hashing_groth_proving_time(self.hashing_constraints_array(sizes))
+
+    def total_proving_time_array(self, sizes):
+        return self.vanilla_proving_time_array(sizes) + self.groth_proving_time_array(sizes)
+
+    def total_seal_time_array(self, sizes):
+        return self.replication_time_array(sizes) + self.total_proving_time_array(sizes)
+
+    # Create a PerformanceArray: the equivalent of calling performance(size) for each of sizes.
+    def performance_array(self, sizes):
+        sizes = np.asarray(sizes, dtype=np.float64)
+        scale = GiB / sizes
+        replication_time = self.replication_time_array(sizes)
+        total_proving_time = self.total_proving_time_array(sizes)
+        seal_time = scale * (replication_time + total_proving_time) / self.relax_time
+        proof_size_per_GiB = scale * self.proof_size()
+        clock_speed_ghz = self.instance.machine.clock_speed_ghz
+        return PerformanceArray(sizes, replication_time, total_proving_time, seal_time, proof_size_per_GiB,
+                                clock_speed_ghz)
+
     def show_times(self, time=None):
         print(f"groth: {humanize_seconds(self.groth_proving_time(time))}; replication: {humanize_seconds(self.replication_time(time))}; seal: {humanize_seconds(self.total_seal_time(time))}")
 
 
 ################################################################################
-#### Unused so far
+#### Used by schedule.simulate
 
-@dataclass
+@hash_once
+@dataclass(frozen=True)
 class Config:
     """Configuration Model"""
     replication_machine: Machine
@@ -456,11 +706,12 @@ class Config:
 
 ################################################################################
 
-z = ZigZag(security=filecoin_security_requirements, partitions=8)
-print(f"ZigZag nodes: {z.nodes(z.sector_size())}")
-
-constraint_test = ZigZag(security=Security(base_degree=5, expansion_degree=2, layers=2, total_challenges=2),
-                         merkle_hash=pedersen,
-                         instance=Instance(constraints=301624, groth_proving_time=2.1, sector_size=1024,
-                                           encoding_replication_time_per_GiB=72858, layers=2,
-                                           machine=Machine(clock_speed_ghz=3.1)))
+# Examples, built on first access (e.g. proofs.z) so that importing this module has no side effects.
+__getattr__ = lazy_attributes(globals(), {
+    'z': lambda: ZigZag(security=filecoin_security_requirements, partitions=8),
+    'constraint_test': lambda: ZigZag(security=Security(base_degree=5, expansion_degree=2, layers=2, total_challenges=2),
+                                      merkle_hash=pedersen,
+                                      instance=Instance(constraints=301624, groth_proving_time=2.1, sector_size=1024,
+                                                        encoding_replication_time_per_GiB=72858, layers=2,
+                                                        machine=Machine(clock_speed_ghz=3.1))),
+})
@@ -1,8 +1,16 @@
 from proofs import *
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
+import numpy as np
 from dataclasses import replace
 
+# matplotlib is slow to import, so only load it when something is plotted.
+def pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+# Calculate zigzag.performance_array(sizes), or read it from store (a store.ResultStore) if one is given.
+def performance_array(zigzag, sizes, store=None):
+    return store.performance_array(zigzag, sizes) if store else zigzag.performance_array(sizes)
+
 def find_approximate_simple_crossing(xs, points_a, points_b):
     last_diff = None
     last_x = None
@@ -17,20 +25,22 @@ def find_approximate_simple_crossing(xs, points_a, points_b):
 
     return cross
 
-def graph_hash_seal_times(pedersen_zigzag, required_performance):
+def graph_hash_seal_times(pedersen_zigzag, required_performance, store=None):
+    plt = pyplot()
     xs = range(1, 8*1024, 64)
     xs = range(1, 1024, 16)
     blake2s_zigzag = pedersen_zigzag.scaled_for_new_hash(blake2s)
     pb50_zigzag = pedersen_zigzag.scaled_for_new_hash(pb50)
-    pedersen_seal_times = [pedersen_zigzag.performance(size * GiB).total_seal_time for size in xs]
-    pb50_seal_times = [pb50_zigzag.performance(size * GiB).total_seal_time for size in xs]
-    blake2s_seal_times = [blake2s_zigzag.performance(size * GiB).total_seal_time for size in xs]
-    blake_advantage_pb50 = list(map(lambda pb50, blake: pb50/blake, pb50_seal_times, blake2s_seal_times))
-    blake_advantage_pedersen = list(map(lambda pedersen, blake: pedersen/blake, pedersen_seal_times, blake2s_seal_times))
+    sizes = np.array(xs) * GiB
+    pedersen_seal_times = performance_array(pedersen_zigzag, sizes, store).total_seal_time
+    pb50_seal_times = performance_array(pb50_zigzag, sizes, store).total_seal_time
+    blake2s_seal_times = performance_array(blake2s_zigzag, sizes, store).total_seal_time
+    blake_advantage_pb50 = pb50_seal_times / blake2s_seal_times
+    blake_advantage_pedersen = pedersen_seal_times / blake2s_seal_times
 
     proof_size_xs = range(1, 200, 10)
-    pedersen_proof_size = [pedersen_zigzag.performance(size).proof_size for size in proof_size_xs]
-    blake2s_proof_size = [blake2s_zigzag.performance(size).proof_size for size in proof_size_xs]
+    pedersen_proof_size = performance_array(pedersen_zigzag, proof_size_xs, store).proof_size
+    blake2s_proof_size = performance_array(blake2s_zigzag, proof_size_xs, store).proof_size
     required_proof_size = [required_performance.proof_size for size in proof_size_xs]
 
     f, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2)
@@ -65,16 +75,16 @@ def graph_hash_seal_times(pedersen_zigzag, required_performance):
     print(f"Seal rates cross at about {humanize_bytes(cross)}")
 
 
-def plot_performance(zigzag, requirements, axis):
+def plot_performance(zigzag, requirements, axis, store=None):
     xs = range(1, 512, 64) # unit GiB
 
     axis.set_title(zigzag.description())
-    max_cycles = [requirements.total_seal_cycles() * size for size in xs]
-    seal_cycles = [zigzag.performance(size * GiB).total_seal_cycles() * size for size in xs]
+    max_cycles = requirements.total_seal_cycles() * np.array(xs)
+    seal_cycles = performance_array(zigzag, np.array(xs) * GiB, store).total_seal_cycles() * xs
 
     mvs = zigzag.minimum_viable_sector_size(requirements)
 
-    if mvs > 0:
+    if mvs:
         axis.plot([mvs/GiB], [zigzag.performance(mvs).total_seal_cycles() * mvs/GiB], 'g.',
                   label=f'min size {humanize_bytes(mvs)}' )
     axis.plot(xs, max_cycles, label='max cycles')
@@ -87,28 +97,31 @@ def plot_performance(zigzag, requirements, axis):
 
 
 # zigzag should use pedersen
-def plot_cycle_graphs(zigzag, requirements, axes):
+def plot_cycle_graphs(zigzag, requirements, axes, store=None):
     (ax1, ax2) = axes
     xs = range(1, 2*1024, 64)
 
-    plot_performance(zigzag, requirements, ax1)
+    plot_performance(zigzag, requirements, ax1, store)
     scaled = zigzag.scaled_for_new_hash(blake2s)
-    scaled.instance.description += ' blake2s'
-    plot_performance(scaled, requirements, ax2)
+    scaled = replace(scaled, instance=replace(scaled.instance, description=scaled.instance.description + ' blake2s'),
+                     size=None)
+    plot_performance(scaled, requirements, ax2, store)
 
-def compare_zigzags(alternatives, *, requirements=filecoin_scaling_requirements):
+def compare_zigzags(alternatives, *, requirements=filecoin_scaling_requirements, store=None):
+    plt = pyplot()
     cols = 2
     rows = len(alternatives)
     f, axes = plt.subplots(rows, cols)
     f.set_size_inches(12, 10)
 
     for (alternative, axis) in zip(alternatives, axes):
-        plot_cycle_graphs(alternative, requirements, axis)
+        plot_cycle_graphs(alternative, requirements, axis, store)
 
     plt.subplots_adjust(hspace = 0.3)
     plt.show()
 
-def plot_relaxed_requirements(zigzag, requirements, target_sector_size):
+def plot_relaxed_requirements(zigzag, requirements, target_sector_size, max_steps=100):
+    plt = pyplot()
     f, ax = plt.subplots()
     ax.set_xlabel('total seal time')
     ax.set_ylabel('minimum sector size (GiB)')
@@ -116,10 +129,11 @@ def plot_relaxed_requirements(zigzag, requirements, target_sector_size):
     done = 10
     xs, ys = [], []
 
-    while done > 0:
+    for _ in range(max_steps):
+        if done <= 0: break
         mvs = zigzag.minimum_viable_sector_size(req)
         xs.append(req.total_seal_time / (60 * 60))
-        ys.append(mvs/GiB)
+        ys.append(mvs/GiB if mvs else np.nan)
         if zigzag.meets_performance_requirements(target_sector_size, req):
             done -= 1
         new_seal_time = req.total_seal_time * 1.1
@@ -128,7 +142,8 @@ def plot_relaxed_requirements(zigzag, requirements, target_sector_size):
     plt.plot(xs, ys, 'gs')
     plt.show()
 
-def plot_accelerated_proving(zigzag, requirements, target_sector_size):
+def plot_accelerated_proving(zigzag, requirements, target_sector_size, max_steps=100):
+    plt = pyplot()
     f, ax = plt.subplots()
     ax.set_xlabel('groth proving time')
     ax.set_ylabel('minimum sector size (GiB)')
@@ -136,20 +151,24 @@ def plot_accelerated_proving(zigzag, requirements, target_sector_size):
     done = 10
     xs, ys = [], []
 
-    while done > 0:
+    # Stop after max_steps even if target_sector_size never becomes viable (e.g. when replication time alone exceeds
+    # the requirements, no amount of proving acceleration will help).
+    for _ in range(max_steps):
+        if done <= 0: break
         mvs = z.minimum_viable_sector_size(requirements)
         xs.append(z.instance.groth_proving_time)
-        ys.append(mvs/GiB)
+        ys.append(mvs/GiB if mvs else np.nan)
         if z.meets_performance_requirements(target_sector_size, requirements):
             done -= 1
         new_proving_time = z.instance.groth_proving_time * 0.5
         new_inst = replace(z.instance, groth_proving_time=new_proving_time)
-        z = replace(z, instance=new_inst)
+        z = replace(z, instance=new_inst, size=None)
 
     plt.plot(xs, ys, 'gs')
     plt.show()
 
-def plot_accelerated_hashing(zigzag, requirements, target_sector_size):
+def plot_accelerated_hashing(zigzag, requirements, target_sector_size, max_steps=100):
+    plt = pyplot()
     f, ax = plt.subplots()
     ax.set_xlabel('hash time')
     ax.set_ylabel('minimum sector size (GiB)')
@@ -158,10 +177,11 @@ def plot_accelerated_hashing(zigzag, requirements, target_sector_size):
     xs, ys = [], []
 
     scale = 1
-    while done > 0:
+    for _ in range(max_steps):
+        if done <= 0: break
         mvs = z.minimum_viable_sector_size(requirements)
         xs.append(scale)
-        ys.append(mvs/GiB)
+        ys.append(mvs/GiB if mvs else np.nan)
         if z.meets_performance_requirements(target_sector_size, requirements):
             done -= 1
         scale *= 0.9
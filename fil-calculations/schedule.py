@@ -0,0 +1,168 @@
+"""Discrete-event simulation of sealing sectors on a fleet of machines.
+
+Each sector is a graph of tasks:
+  - encoding: one task per layer, in sequence, each on a single core (encoding a layer is inherently sequential);
+  - tree building: one tree for the data, and one per layer once that layer is encoded;
+  - vanilla proving, once all trees are built;
+  - Groth proving: one independent task per partition.
+Replication tasks (encoding, trees, vanilla proving) for a sector all run on the replication machine that starts it.
+Groth proving tasks run on any proving machine. Ready tasks are started first-come first-served whenever a machine has
+enough free cores.
+
+A task holds its cores for its whole duration, but a tree parallelizes imperfectly over them, so cores can be held but
+idle. Utilization counts the core-seconds of computation done; occupancy counts those held.
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass, replace
+
+import merkle
+from proofs import GiB
+
+@dataclass
+class Task:
+    sector: int
+    kind: str # 'encode', 'tree', 'vanilla' or 'groth'
+    machine_kind: str # 'replication' or 'proving'
+    duration: float # wall-clock seconds, when given cores
+    cores: int
+    work: float = None # core-seconds of computation (default duration * cores: perfectly parallel)
+    dependencies: int = 0 # unfinished tasks this task waits for
+    successors: list = None
+
+@dataclass
+class MachineState:
+    kind: str
+    cores: int
+    free: int
+    busy_core_seconds: float = 0 # held by tasks
+    work_core_seconds: float = 0 # of computation
+
+@dataclass
+class SimulationResult:
+    sectors: int
+    sector_size: int
+    makespan: float # seconds until the last sector is sealed
+    sector_completion_times: list
+    utilization: dict # machine kind -> fraction of core-seconds over the makespan spent computing
+    occupancy: dict # machine kind -> fraction of core-seconds over the makespan held by tasks
+
+    def sectors_per_day(self):
+        return self.sectors * 24 * 60 * 60 / self.makespan
+
+    def bytes_per_day(self):
+        return self.sectors_per_day() * self.sector_size
+
+    def mean_latency(self):
+        return sum(self.sector_completion_times) / self.sectors
+
+# Split zigzag's replication_time at size into encoding time (all layers, on one core) and the core-seconds to build each
+# tree, so that simulated work matches total_seal_time.
+def replication_split(zigzag, size):
+    if zigzag.instance:
+        encoding_time = zigzag.instance.encoding_replication_time_per_GiB * (size / GiB)
+    else:
+        encoding_time = zigzag.replicate_min(size)
+    tree_core_seconds = max(zigzag.replication_time(size) - encoding_time, 0) / (zigzag.security.layers + 1)
+    return (encoding_time, tree_core_seconds)
+
+# The tasks sealing one sector, with their dependencies, on the machines in config.
+def sector_tasks(config, sector, tree_cores=None, groth_cores=None):
+    zigzag = config.zigzag
+    size = zigzag.sector_size()
+    layers = zigzag.security.layers
+    replication_cores = config.replication_machine.cores or 1
+    proving_cores = config.proving_machine.cores or 1
+    tree_cores = min(tree_cores or max(1, replication_cores // (layers + 1)), replication_cores)
+    groth_cores = min(groth_cores or proving_cores, proving_cores)
+
+    (encoding_time, tree_core_seconds) = replication_split(zigzag, size)
+    # A tree's levels limit how well it parallelizes over tree_cores.
+    tree_machine = replace(config.replication_machine, cores=tree_cores)
+    speedup = merkle.merkle_cost(zigzag.nodes(size), zigzag.merkle_hash, tree_machine, trees=1,
+                                 node_size=zigzag.node_size, apex_height=zigzag.apex_height).parallel_speedup()
+    vanilla_time = zigzag.vanilla_proving_time(size)
+    partition_time = zigzag.groth_proving_time(size) / zigzag.partitions
+
+    encodes = [Task(sector, 'encode', 'replication', encoding_time / layers, 1) for _ in range(layers)]
+    trees = [Task(sector, 'tree', 'replication', tree_core_seconds / speedup, tree_cores, tree_core_seconds)
+             for _ in range(layers + 1)]
+    vanilla = Task(sector, 'vanilla', 'replication', vanilla_time / tree_cores, tree_cores)
+    groths = [Task(sector, 'groth', 'proving', partition_time / groth_cores, groth_cores)
+              for _ in range(zigzag.partitions)]
+
+    edges = list(zip(encodes, encodes[1:])) + list(zip(encodes, trees[1:])) + [(tree, vanilla) for tree in trees] \
+        + [(vanilla, groth) for groth in groths]
+    tasks = encodes + trees + [vanilla] + groths
+    for task in tasks:
+        task.successors = []
+    for (before, after) in edges:
+        before.successors.append(after)
+        after.dependencies += 1
+    return tasks
+
+# Simulate sealing sectors (all available at time 0) on replication_machines copies of config.replication_machine and
+# proving_machines copies of config.proving_machine.
+def simulate(config, sectors, replication_machines=1, proving_machines=1, tree_cores=None, groth_cores=None):
+    machines = [MachineState('replication', config.replication_machine.cores or 1, config.replication_machine.cores or 1)
+                for _ in range(replication_machines)] + \
+               [MachineState('proving', config.proving_machine.cores or 1, config.proving_machine.cores or 1)
+                for _ in range(proving_machines)]
+
+    ready = []
+    remaining = {}
+    for sector in range(sectors):
+        tasks = sector_tasks(config, sector, tree_cores, groth_cores)
+        remaining[sector] = len(tasks)
+        ready += [task for task in tasks if task.dependencies == 0]
+
+    pinned = {} # sector -> replication machine
+    running = [] # heap of (end time, sequence, task, machine)
+    sequence = itertools.count()
+    completion_times = []
+    now = 0.0
+
+    def dispatch():
+        waiting = []
+        for task in ready:
+            if task.machine_kind == 'replication' and task.sector in pinned:
+                candidates = [pinned[task.sector]]
+            else:
+                candidates = [m for m in machines if m.kind == task.machine_kind]
+            machine = next((m for m in candidates if m.free >= task.cores), None)
+            if machine is None:
+                waiting.append(task)
+                continue
+            if task.machine_kind == 'replication':
+                pinned[task.sector] = machine
+            machine.free -= task.cores
+            machine.busy_core_seconds += task.duration * task.cores
+            machine.work_core_seconds += task.work if task.work is not None else task.duration * task.cores
+            heapq.heappush(running, (now + task.duration, next(sequence), task, machine))
+        ready[:] = waiting
+
+    dispatch()
+    while running:
+        (now, _, task, machine) = heapq.heappop(running)
+        machine.free += task.cores
+        for successor in task.successors:
+            successor.dependencies -= 1
+            if successor.dependencies == 0:
+                ready.append(successor)
+        remaining[task.sector] -= 1
+        if remaining[task.sector] == 0:
+            completion_times.append(now)
+            pinned.pop(task.sector, None)
+        dispatch()
+
+    assert not ready, "tasks could not be scheduled"
+
+    (utilization, occupancy) = ({}, {})
+    for kind in ('replication', 'proving'):
+        kind_machines = [m for m in machines if m.kind == kind]
+        capacity = sum(m.cores for m in kind_machines) * now
+        utilization[kind] = sum(m.work_core_seconds for m in kind_machines) / capacity if capacity else 0
+        occupancy[kind] = sum(m.busy_core_seconds for m in kind_machines) / capacity if capacity else 0
+
+    return SimulationResult(sectors, config.zigzag.sector_size(), now, completion_times, utilization, occupancy)
@@ -1,8 +1,14 @@
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+import proofs
 from perf_data import filecoin_zigzag
-from proofs import ZigZag
+from proofs import ZigZag, replace_security, with_field
+from util import lazy_attributes
 
-@dataclass
+@dataclass(frozen=True)
 class Security:
     zigzag: ZigZag
     encoding_speedup: float
@@ -22,11 +28,107 @@ class Security:
         return self.zigzag.performance().proof_size * self.proof_count
 
 
+################################################################################
+# Security parameters (proofs.Security) derived from a soundness target, rather than given as literals.
+#
+# Following the ZigZag calculator's analysis: a prover who does not store a fraction delta of a layer's nodes is caught
+# by each challenge with probability delta, so soundness_bits of security needs
+#     challenges = ceil(soundness_bits / -log2(1 - delta))
+# per layer. Each expander layer halves the space a cheating prover can save, so reaching spacegap epsilon needs
+#     layers = ceil(log2(1 / (3 * (epsilon - 2 * delta))))
+# which is only possible when epsilon > 2 * delta.
+# delta may depend on the graph: pass robustness as a function of (base_degree, expansion_degree) returning delta.
+#
+# Tapering (see proofs.tapered_challenges) reduces the challenges of the last taper_layers layers by a factor of
+# (1 - taper) per layer, so needs at least taper_layers layers. Adding layers only shrinks the spacegap, so where the
+# spacegap needs fewer, layers is raised to taper_layers; spacegap_layers records what the spacegap alone needs.
+
+def challenges_for_soundness(soundness_bits, delta):
+    with np.errstate(divide='ignore'):
+        return np.ceil(np.asarray(soundness_bits, dtype=np.float64) / -np.log2(1 - np.asarray(delta, dtype=np.float64)))
+
+# nan where epsilon <= 2 * delta.
+def layers_for_spacegap(epsilon, delta):
+    gap = np.asarray(epsilon, dtype=np.float64) - 2 * np.asarray(delta, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(gap > 0, np.maximum(np.ceil(np.log2(1 / (3 * gap))), 1), np.nan)
+
+# Total challenges over all layers (the sum of proofs.tapered_challenges), vectorized over challenges and layers.
+def total_tapered_challenges(challenges, layers, taper=0, taper_layers=0):
+    challenges = np.asarray(challenges, dtype=np.float64)
+    tapered_layers = np.minimum(int(taper_layers), np.asarray(layers, dtype=np.float64))
+    total = challenges * (layers - tapered_layers)
+    for k in range(1, int(taper_layers) + 1):
+        total = total + np.where(k <= tapered_layers, np.ceil(challenges * (1 - taper) ** k), 0)
+    return total
+
+@dataclass
+class SecurityGrid:
+    """Derived security parameters for every (base_degree, expansion_degree) pair. Arrays have the grid's shape."""
+    base_degree: np.ndarray
+    expansion_degree: np.ndarray
+    delta: np.ndarray
+    challenges: np.ndarray # per untapered layer
+    layers: np.ndarray # nan where the spacegap cannot be reached
+    total_challenges: np.ndarray
+    taper: float
+    taper_layers: int
+    spacegap_layers: np.ndarray # layers needed for the spacegap, before raising to taper_layers
+
+    def feasible(self):
+        return ~np.isnan(self.layers)
+
+    # proofs.Security for grid position index (a tuple, or an integer into the flattened grid).
+    def security(self, index, sloth_iter=0):
+        index = np.unravel_index(index, self.layers.shape) if np.ndim(index) == 0 else tuple(index)
+        assert self.feasible()[index], "spacegap cannot be reached with this delta"
+        return proofs.Security(base_degree=int(self.base_degree[index]),
+                               expansion_degree=int(self.expansion_degree[index]),
+                               layers=int(self.layers[index]),
+                               challenges=int(self.challenges[index]), taper=self.taper,
+                               taper_layers=self.taper_layers, sloth_iter=sloth_iter)
+
+    def schedule(self, index):
+        index = np.unravel_index(index, self.layers.shape) if np.ndim(index) == 0 else tuple(index)
+        return proofs.tapered_challenges(self.challenges[index], int(self.layers[index]), self.taper, self.taper_layers)
+
+    # zigzag.hashing_constraints() for each grid position, as zigzag with that position's security would compute it,
+    # for sector size (default: zigzag's).
+    def hashing_constraints(self, zigzag, size=None):
+        degrees = replace_security(zigzag.security, base_degree=self.base_degree,
+                                   expansion_degree=self.expansion_degree)
+        per_challenge = with_field(zigzag, 'security', degrees).hashing_constraints_per_challenge(size)
+        return per_challenge * (self.total_challenges / zigzag.partitions)
+
+    # zigzag with security for grid position index. Instances are not rescaled: use with zigzags without an instance.
+    def zigzag(self, zigzag, index):
+        return replace(zigzag, security=self.security(index))
+
+# Solve for security parameters over the grid of base_degrees x expansion_degrees.
+# robustness is delta: a number, or a function of (base_degree, expansion_degree) arrays returning delta.
+def solve_security(base_degrees=(5,), expansion_degrees=(8,), soundness_bits=10, spacegap=0.2, robustness=0.02,
+                   taper=0, taper_layers=0):
+    (base_degree, expansion_degree) = np.meshgrid(np.asarray(base_degrees, dtype=np.float64),
+                                                  np.asarray(expansion_degrees, dtype=np.float64), indexing='ij')
+    delta = robustness(base_degree, expansion_degree) if callable(robustness) else robustness
+    delta = np.broadcast_to(np.asarray(delta, dtype=np.float64), base_degree.shape)
+
+    challenges = challenges_for_soundness(soundness_bits, delta)
+    spacegap_layers = layers_for_spacegap(spacegap, delta)
+    layers = np.maximum(spacegap_layers, taper_layers) # nan stays nan
+    total = total_tapered_challenges(challenges, np.nan_to_num(layers), taper, taper_layers)
+    total = np.where(np.isnan(layers), np.nan, total)
+    return SecurityGrid(base_degree, expansion_degree, delta, challenges, layers, total, taper, taper_layers,
+                        spacegap_layers)
+
+
 
 
-filsec = Security(zigzag = filecoin_zigzag,
-                  encoding_speedup = 100,
-                  drg_cheat = 1/4,
-                  late_submission_overhead = 4,
-                  proof_count = 10
-                  )
+__getattr__ = lazy_attributes(globals(), {
+    'filsec': lambda: Security(zigzag = filecoin_zigzag,
+                               encoding_speedup = 100,
+                               drg_cheat = 1/4,
+                               late_submission_overhead = 4,
+                               proof_count = 10
+                               ),
+})
@@ -0,0 +1,127 @@
+"""Sensitivity of seal time, Groth proving time and minimum viable sector size to every numeric model field.
+
+Derivatives are central finite differences, all computed in one evaluation of the model: every perturbed field is set
+to an array with one pair of entries per field, where entries 2i and 2i+1 hold field i's value stepped up and down, and
+every other entry holds its base value. The model's arithmetic then yields all perturbed results at once.
+
+    for s in ranked(sensitivities(filecoin_zigzag), 'total_seal_time')[:5]:
+        print(s.path, s.elasticity)
+
+Elasticity is the relative change in a metric per relative change in a field: 0.5 means a 1% faster hash (for example)
+gives 0.5% less seal time. Minimum viable sector size is the continuous bound (solver.minimum_viable_size_bound),
+since the power-of-two size is a step function; it requires an instance.
+"""
+
+from dataclasses import dataclass, fields, is_dataclass
+
+import numpy as np
+
+import solver
+from proofs import filecoin_scaling_requirements, with_field
+
+metric_names = ('total_seal_time', 'groth_proving_time', 'minimum_viable_sector_size')
+
+# Fields which are structural (sizes which must be powers of two, apex_height which selects code paths), or not used
+# arithmetically, so have no meaningful derivative.
+excluded_fields = {'size', 'hash_size', 'sector_size', 'apex_height', 'ram_gb', 'cores', 'hourly_cost',
+                   'memory_bandwidth_gb', 'disk_throughput_gb', 'disk_iops', 'ram_cache_gb', 'taper_layers'}
+
+# Fields which the model checks with plain Python conditionals (or uses to build a taper schedule), so cannot be
+# arrays. These are perturbed one at a time.
+scalar_fields = {'instance.constraints', 'security.challenges', 'security.taper', 'security.layers',
+                 'instance.security.challenges', 'instance.security.taper', 'instance.security.layers'}
+
+# Dotted paths of every numeric field reachable from model.
+def numeric_fields(model, prefix=''):
+    paths = []
+    for f in fields(model):
+        value = getattr(model, f.name)
+        path = prefix + f.name
+        if f.name in excluded_fields or value is None or isinstance(value, bool):
+            continue
+        if is_dataclass(value):
+            paths += numeric_fields(value, path + '.')
+        elif isinstance(value, (int, float)):
+            paths.append(path)
+    return paths
+
+def get_field(model, path):
+    for name in path.split('.'):
+        model = getattr(model, name)
+    return model
+
+# Metrics for zigzag, whose fields may be arrays of n entries, as arrays of length n.
+def evaluate(zigzag, n, requirements=filecoin_scaling_requirements):
+    broadcast = lambda x: np.broadcast_to(np.asarray(x, dtype=np.float64), (n,))
+    results = {'total_seal_time': broadcast(zigzag.total_seal_time()),
+               'groth_proving_time': broadcast(zigzag.groth_proving_time())}
+    if zigzag.instance:
+        (a, b) = solver.seal_time_coefficients(zigzag)
+        results['minimum_viable_sector_size'] = solver.minimum_viable_bound_array(
+            broadcast(a), broadcast(b), broadcast(zigzag.instance.machine.clock_speed_ghz),
+            broadcast(zigzag.relax_time), broadcast(zigzag.proof_size()), requirements.total_seal_cycles(),
+            float(requirements.proof_size))
+    else:
+        results['minimum_viable_sector_size'] = np.full(n, np.nan)
+    return results
+
+@dataclass(frozen=True)
+class Sensitivity:
+    path: str # dotted field path
+    metric: str
+    field_value: float
+    metric_value: float
+    derivative: float # d metric / d field
+    elasticity: float # (d metric / metric) / (d field / field); nan when field or metric is zero
+
+def _steps(values, step):
+    return np.where(values != 0, np.abs(values) * step, step)
+
+# Sensitivities of metric_names to every field in paths (default: all numeric_fields of zigzag), using a relative step.
+def sensitivities(zigzag, paths=None, step=1e-4, requirements=filecoin_scaling_requirements):
+    paths = list(paths if paths is not None else numeric_fields(zigzag))
+    batched = [p for p in paths if p not in scalar_fields]
+    values = np.array([float(get_field(zigzag, p)) for p in batched])
+    deltas = _steps(values, step)
+    n = 2 * len(batched) + 1 # the last entry is the unperturbed model
+
+    perturbed = zigzag
+    for (i, (path, value, delta)) in enumerate(zip(batched, values, deltas)):
+        column = np.full(n, value)
+        column[2 * i] += delta
+        column[2 * i + 1] -= delta
+        perturbed = with_field(perturbed, path, column)
+    results = evaluate(perturbed, n, requirements)
+    up = {name: r[0:-1:2] for (name, r) in results.items()}
+    down = {name: r[1:-1:2] for (name, r) in results.items()}
+    base = {name: r[-1] for (name, r) in results.items()}
+
+    # Fields which cannot be arrays: evaluate each perturbation separately. Integer fields (such as layers, which must
+    # stay whole to build a taper schedule) are stepped by at least 1.
+    for path in [p for p in paths if p in scalar_fields]:
+        field = get_field(zigzag, path)
+        value = float(field)
+        delta = float(_steps(np.array(value), step))
+        if isinstance(field, int):
+            delta = max(round(delta), 1)
+        (hi, lo) = (evaluate(with_field(zigzag, path, type(field)(value + sign * delta)), 1, requirements)
+                    for sign in (1, -1))
+        for name in metric_names:
+            up[name] = np.append(up[name], hi[name])
+            down[name] = np.append(down[name], lo[name])
+        values, deltas = np.append(values, value), np.append(deltas, delta)
+        batched.append(path)
+
+    result = []
+    for name in metric_names:
+        derivatives = (up[name] - down[name]) / (2 * deltas)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            elasticities = np.where((values != 0) & (base[name] != 0), derivatives * values / base[name], np.nan)
+        for (path, value, derivative, elasticity) in zip(batched, values, derivatives, elasticities):
+            result.append(Sensitivity(path, name, value, base[name], derivative, elasticity))
+    return result
+
+# Sensitivities for metric, largest absolute elasticity first (fields with no elasticity last).
+def ranked(sensitivities, metric='total_seal_time'):
+    chosen = [s for s in sensitivities if s.metric == metric]
+    return sorted(chosen, key=lambda s: -abs(s.elasticity) if not np.isnan(s.elasticity) else np.inf)
@@ -0,0 +1,149 @@
+"""Interactive what-if sessions which recompute only the results affected by a change to the model.
+
+A Session wraps a ZigZag and a set of named results, each a function of the model (and of other results) declared
+with the fields it depends on:
+
+    session = Session(projected)
+    session.add('mvs', lambda z: z.minimum_viable_sector_size(filecoin_scaling_requirements),
+                depends_on=session.metric_fields('seal_time_per_GiB', 'proof_size_per_GiB')
+                           + ('instance.machine.clock_speed_ghz',))
+    session.add('apex', apex.optimize) # no depends_on: depends on every field
+    session.add('plot', lambda z, apex: plot_apex(apex), depends_on=(), inputs=('apex',))
+    session.watch('plot')
+
+    session.set('instance.groth_acceleration', 8)      # recomputes mvs, apex and plot
+    session.update(session.zigzag.scaled_for_new_hash(blake2s))
+    session['mvs']
+
+Changes are found by comparing the old and new models field by field, so a model from replace() or
+scaled_for_new_hash() invalidates exactly the results depending on a field that differs. Results are recomputed
+lazily, on access, except watched ones, which are recomputed (and their callbacks called) after every change.
+session.metrics() gives the graph.metric_names, kept current by incremental graph evaluation.
+"""
+
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+
+import graph
+from proofs import with_field
+
+sector_size_fields = ('size', 'instance.sector_size') # what graph's size and sector_size parameters come from
+
+# Dotted paths of fields which differ between models a and b. A whole subtree is one path when either side is not a
+# dataclass (e.g. an instance added or removed).
+def changed_fields(a, b, prefix=''):
+    if a is b:
+        return []
+    if is_dataclass(a) and is_dataclass(b) and type(a) == type(b):
+        paths = []
+        for f in fields(a):
+            paths += changed_fields(getattr(a, f.name), getattr(b, f.name), prefix + f.name + '.')
+        return paths
+    try:
+        same = bool(a == b)
+    except ValueError: # arrays
+        same = np.array_equal(a, b)
+    return [] if same else [prefix[:-1]]
+
+# Does a change to the field at path affect something depending on the field at dependency? Either may be a prefix of
+# the other: a change to 'instance' affects 'instance.constraints', and vice versa.
+def affects(path, dependency):
+    return path == dependency or path.startswith(dependency + '.') or dependency.startswith(path + '.')
+
+class Result:
+    def __init__(self, name, function, depends_on, inputs):
+        self.name = name
+        self.function = function
+        self.depends_on = depends_on # field paths, or None for all
+        self.inputs = inputs # names of other results, passed after the model
+        self.stale = True
+        self.value = None
+        self.computations = 0
+
+class Session:
+    def __init__(self, zigzag):
+        self.zigzag = zigzag
+        self.results = {}
+        self.watchers = {} # result name -> callbacks
+        self._evaluation = graph.Evaluation.of(zigzag)
+
+    # Field paths which the graph quantities metrics depend on, for the current model's schema.
+    def metric_fields(self, *metrics):
+        paths = set()
+        for metric in metrics:
+            for parameter in graph.dependencies(metric, graph.schema(self.zigzag)):
+                paths.update(sector_size_fields if parameter in graph.special_parameters else (parameter,))
+        return tuple(sorted(paths))
+
+    # Add a result: function(zigzag, *[results named in inputs]), recomputed when a field in depends_on (default: any
+    # field) or one of its inputs changes.
+    def add(self, name, function, depends_on=None, inputs=()):
+        assert name not in self.results, f"result {name} already defined"
+        unknown = [i for i in inputs if i not in self.results]
+        assert not unknown, f"unknown inputs: {unknown}"
+        self.results[name] = Result(name, function, tuple(depends_on) if depends_on is not None else None,
+                                    tuple(inputs))
+        return self
+
+    # Call callback(value) with name's value now, and whenever it changes.
+    def watch(self, name, callback=None):
+        self.watchers.setdefault(name, []).append(callback or (lambda value: None))
+        self._notify([name])
+
+    def __getitem__(self, name):
+        result = self.results[name]
+        if result.stale:
+            inputs = [self[i] for i in result.inputs]
+            result.value = result.function(self.zigzag, *inputs)
+            result.computations += 1
+            result.stale = False
+        return result.value
+
+    def metrics(self):
+        return {name: self._evaluation[name] for name in graph.metric_names}
+
+    # Set the field at dotted path to value.
+    def set(self, path, value):
+        return self.update(with_field(self.zigzag, path, value))
+
+    # Replace the model with zigzag. Returns the names of the results invalidated.
+    def update(self, zigzag):
+        changed = changed_fields(self.zigzag, zigzag)
+        schema_changed = graph.schema(zigzag) != graph.schema(self.zigzag)
+        self.zigzag = zigzag
+        if not changed:
+            return []
+
+        if schema_changed:
+            self._evaluation = graph.Evaluation.of(zigzag)
+        else:
+            self._update_metrics(changed)
+
+        invalidated = []
+        for result in self.results.values(): # in order added, so inputs come first
+            if result.depends_on is None or any(affects(path, d) for path in changed for d in result.depends_on) \
+                    or any(i in invalidated for i in result.inputs):
+                result.stale = True
+                invalidated.append(result.name)
+        self._notify(invalidated)
+        return invalidated
+
+    def _update_metrics(self, changed):
+        parameters = self._evaluation.compiled.parameters
+        affected = [p for p in parameters if any(affects(path, p) for path in changed)
+                    or (p in graph.special_parameters and any(affects(path, d) for path in changed
+                                                              for d in sector_size_fields))]
+        if affected:
+            self._evaluation.update(graph.parameters(self.zigzag, affected))
+
+    def _notify(self, names):
+        for name in names:
+            if name in self.watchers:
+                value = self[name]
+                for callback in self.watchers[name]:
+                    callback(value)
+
+    # Results which would be recomputed on next access.
+    def stale(self):
+        return [name for (name, result) in self.results.items() if result.stale]
@@ -0,0 +1,192 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from proofs import GiB, Performance
+
+# Search bounds for sector sizes (bytes). Both are powers of two.
+min_sector_size = 32 # one node
+max_sector_size = 2**60 # 1 EiB
+
+@dataclass
+class SectorSizeSolution:
+    """Result of a minimum viable sector size search."""
+    sector_size: int=None # None when infeasible
+    evaluations: int=0 # performance() evaluations spent
+    reason: str=None # why no solution exists, if infeasible
+
+    def feasible(self):
+        return self.sector_size is not None
+
+def round_up(size, granularity=None):
+    """Round size up to a multiple of granularity, or to a power of two if granularity is None."""
+    if granularity:
+        return math.ceil(size / granularity) * granularity
+    return 2 ** max(0, math.ceil(math.log2(size)))
+
+# With an instance, total_seal_time(size) is exactly linear in size: a * size + b.
+# (Replication time scales linearly with size, and proving time does not depend on size at all.)
+def seal_time_coefficients(zigzag):
+    assert zigzag.instance, "seal time is only linear in size when an instance is present"
+    a = zigzag.replication_time(GiB) / GiB
+    b = zigzag.vanilla_proving_time() + zigzag.groth_proving_time()
+    return (a, b)
+
+# Smallest (real-valued) size satisfying requirements, or None if no size does.
+# Condition on seal time: (GiB / size) * (a * size + b) / relax * clock <= required_seal_time * required_clock
+# Condition on proof size: (GiB / size) * proof_size <= required_proof_size
+def minimum_viable_size_bound(zigzag, requirements):
+    (a, b) = seal_time_coefficients(zigzag)
+    clock = zigzag.instance.machine.clock_speed_ghz
+    limit = (requirements.total_seal_cycles() / (clock * 10**9)) * zigzag.relax_time / GiB
+    slack = limit - a
+
+    if b < 0:
+        # Per-GiB seal time increases with size, so only the smallest size can possibly be viable.
+        time_bound = 0 if (a + b / min_sector_size) <= limit else None
+    elif b == 0:
+        time_bound = 0 if slack >= 0 else None
+    else:
+        time_bound = b / slack if slack > 0 else None
+
+    if time_bound is None:
+        return None
+
+    proof_bound = (zigzag.proof_size() * GiB) / requirements.proof_size if requirements.proof_size > 0 else None
+    if proof_bound is None:
+        return None
+
+    return max(time_bound, proof_bound, min_sector_size)
+
+# Does zigzag meet requirements at size? Without an instance there is no machine, so seal time is measured in cycles at
+# the requirements' clock speed, from the per-hash timings of replicate_max and hashing constraints.
+def meets_requirements(zigzag, size, requirements):
+    if zigzag.instance:
+        return zigzag.meets_performance_requirements(size, requirements)
+    seal_time_per_GiB = (GiB / size) * zigzag.total_seal_time(size) / zigzag.relax_time
+    performance = Performance(seal_time_per_GiB, (GiB / size) * zigzag.proof_size(), requirements.clock_speed_ghz)
+    return requirements.satisfied_by(performance)
+
+# Find the minimum viable sector size, by bisection over a monotone requirement.
+# Assumes that if a size is viable, all larger sizes are, which holds for ZigZag since per-GiB seal time and
+# proof size both decrease with size.
+# Sizes are powers of two, or multiples of granularity if given.
+def bisect_minimum_viable_sector_size(zigzag, requirements, granularity=None, low=min_sector_size,
+                                      high=max_sector_size):
+    evaluations = 0
+
+    def viable(size):
+        nonlocal evaluations
+        evaluations += 1
+        return meets_requirements(zigzag, size, requirements)
+
+    # Search over integer steps: exponents for powers of two, multiples for granularity.
+    if granularity:
+        to_size = lambda step: step * granularity
+        lo, hi = math.ceil(low / granularity), high // granularity
+    else:
+        to_size = lambda step: 2 ** step
+        lo, hi = math.ceil(math.log2(low)), math.floor(math.log2(high))
+
+    if not viable(to_size(hi)):
+        return SectorSizeSolution(evaluations=evaluations, reason=f"not viable at maximum size {to_size(hi)}")
+    if viable(to_size(lo)):
+        return SectorSizeSolution(to_size(lo), evaluations)
+
+    # Invariant: lo is not viable, hi is viable.
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if viable(to_size(mid)):
+            hi = mid
+        else:
+            lo = mid
+
+    return SectorSizeSolution(to_size(hi), evaluations)
+
+# Find the minimum viable sector size. Uses the closed form when an instance is present and verifies the result
+# (stepping up to absorb floating-point error), otherwise falls back to bisection.
+def minimum_viable_sector_size(zigzag, requirements, granularity=None):
+    if not zigzag.instance:
+        return bisect_minimum_viable_sector_size(zigzag, requirements, granularity)
+
+    bound = minimum_viable_size_bound(zigzag, requirements)
+    if bound is None:
+        return SectorSizeSolution(reason="requirements are not met at any sector size")
+
+    size = round_up(bound, granularity)
+    evaluations = 0
+    for _ in range(3):
+        if size > max_sector_size:
+            break
+        evaluations += 1
+        if zigzag.meets_performance_requirements(size, requirements):
+            return SectorSizeSolution(size, evaluations)
+        size = size + granularity if granularity else size * 2
+
+    # Closed form disagrees with the model (should not happen). Bisection is always correct.
+    solution = bisect_minimum_viable_sector_size(zigzag, requirements, granularity)
+    solution.evaluations += evaluations
+    return solution
+
+# Vectorized minimum_viable_size_bound, over arrays of seal time coefficients a and b, clock speeds, relax_times, proof
+# sizes and requirements. nan where infeasible.
+def minimum_viable_bound_array(a, b, clock, relax, proof_size, required_cycles, required_proof_size):
+    limit = (required_cycles / (clock * 10**9)) * relax / GiB
+    slack = limit - a
+    with np.errstate(divide='ignore', invalid='ignore'):
+        time_bound = np.where(b > 0, np.where(slack > 0, b / slack, np.nan),
+                              np.where((b < 0) | (slack >= 0), 0, np.nan))
+        time_bound = np.where((b < 0) & ((a + b / min_sector_size) > limit), np.nan, time_bound)
+        proof_bound = np.where(required_proof_size > 0, (proof_size * GiB) / required_proof_size, np.nan)
+        return np.maximum(np.maximum(time_bound, proof_bound), min_sector_size)
+
+# minimum_viable_bound_array, rounded up to powers of two (or multiples of granularity). nan where infeasible. Results
+# are not verified against the model; see minimum_viable_sector_sizes.
+def minimum_viable_size_array(a, b, clock, relax, proof_size, required_cycles, required_proof_size, granularity=None):
+    bound = minimum_viable_bound_array(a, b, clock, relax, proof_size, required_cycles, required_proof_size)
+    with np.errstate(invalid='ignore'):
+        if granularity:
+            sizes = np.ceil(bound / granularity) * granularity
+        else:
+            sizes = 2 ** np.ceil(np.log2(bound))
+        sizes = np.where(sizes > max_sector_size, np.nan, sizes)
+    return sizes
+
+# Solve many (zigzag, requirements) pairs at once. requirements may be a single Performance, applied to every zigzag.
+# Returns an array of sector sizes, with nan where infeasible.
+def minimum_viable_sector_sizes(zigzags, requirements, granularity=None):
+    if not isinstance(requirements, (list, tuple)):
+        requirements = [requirements] * len(zigzags)
+    assert len(requirements) == len(zigzags)
+
+    result = np.full(len(zigzags), np.nan)
+    closed_form = [i for (i, z) in enumerate(zigzags) if z.instance]
+
+    if closed_form:
+        zs = [zigzags[i] for i in closed_form]
+        rs = [requirements[i] for i in closed_form]
+        coefficients = np.array([seal_time_coefficients(z) for z in zs])
+        a, b = coefficients[:, 0], coefficients[:, 1]
+        clock = np.array([z.instance.machine.clock_speed_ghz for z in zs])
+        relax = np.array([z.relax_time for z in zs])
+        proof_size = np.array([z.proof_size() for z in zs])
+        required_cycles = np.array([r.total_seal_cycles() for r in rs])
+        required_proof_size = np.array([r.proof_size for r in rs], dtype=np.float64)
+
+        sizes = minimum_viable_size_array(a, b, clock, relax, proof_size, required_cycles, required_proof_size,
+                                          granularity)
+        result[closed_form] = sizes
+
+        # Verify each closed-form answer against the model; fix up any floating-point disagreement.
+        for (i, z, r) in zip(closed_form, zs, rs):
+            if not np.isnan(result[i]) and not z.meets_performance_requirements(result[i], r):
+                size = minimum_viable_sector_size(z, r, granularity).sector_size
+                result[i] = np.nan if size is None else size
+
+    for (i, z) in enumerate(zigzags):
+        if not z.instance:
+            size = bisect_minimum_viable_sector_size(z, requirements[i], granularity).sector_size
+            result[i] = np.nan if size is None else size
+
+    return result
@@ -0,0 +1,127 @@
+"""Storage I/O while sealing: bytes moved to and from disk, what fits in RAM, and whether each stage is I/O-bound.
+
+Replication time elsewhere is hashing time only. Here each stage of a seal also moves data:
+  - encoding reads the data and writes each of `layers` layers. Encoding a node reads its parents (base parents from
+    the layer being encoded, expansion parents from the previous one), which are random reads unless both layers fit
+    in the RAM cache;
+  - tree building writes the internal nodes of one tree per layer, plus one for the data, reading each layer back
+    from disk unless it was still cached when it was encoded;
+  - vanilla proving opens (degree + 2) nodes per challenge, with their Merkle paths. These are random reads, except
+    for whatever of the layers and trees is kept in RAM (as with MAXIMIZE_CACHING=1).
+Sequential bytes cost Machine.disk_throughput_gb, random reads Machine.disk_iops. A stage takes the longer of its CPU
+and I/O time, assuming they overlap; stages are summed, so wall_clock is an upper bound when trees are built while
+encoding continues.
+
+    nvme = replace(perf_data.ec2_x1e32_xlarge_machine, disk_throughput_gb=2, disk_iops=4e5, ram_cache_gb=512)
+    seal = seal_io(ZigZag(instance=perf_data.x1e32_xlarge_64), nvme)
+    seal.bytes_moved(), seal.trees_fit_in_memory, [stage.name for stage in seal.io_bound_stages()]
+"""
+
+from dataclasses import dataclass
+
+import merkle
+from proofs import GiB
+from schedule import replication_split
+
+@dataclass
+class StageIO:
+    name: str # 'encode', 'tree' or 'vanilla'
+    cpu_time: float # wall-clock seconds of computation on the machine
+    bytes_read: float # sequential, from disk
+    bytes_written: float
+    random_reads: float # node-sized reads from disk
+    io_time: float # seconds
+    node_size: int = 32
+
+    def wall_clock(self):
+        return max(self.cpu_time, self.io_time)
+
+    def io_bound(self):
+        return self.io_time > self.cpu_time
+
+    def bytes_moved(self):
+        return self.bytes_read + self.bytes_written + self.random_reads * self.node_size
+
+@dataclass
+class SealIO:
+    """Storage I/O of replicating one sector and proving it (Groth proving does no disk I/O, so is excluded)."""
+    sector_size: int
+    cache_bytes: float # inf if unlimited
+    layer_bytes: float
+    tree_bytes: float # per tree
+    layers_fit_in_memory: bool # the two layers encoding works on
+    trees_fit_in_memory: bool # all trees
+    replica_fits_in_memory: bool # all trees and layers
+    stages: list
+
+    def bytes_moved(self):
+        return sum(stage.bytes_moved() for stage in self.stages)
+
+    def random_reads(self):
+        return sum(stage.random_reads for stage in self.stages)
+
+    def cpu_time(self):
+        return sum(stage.cpu_time for stage in self.stages)
+
+    def io_time(self):
+        return sum(stage.io_time for stage in self.stages)
+
+    def wall_clock(self):
+        return sum(stage.wall_clock() for stage in self.stages)
+
+    def io_bound_stages(self):
+        return [stage for stage in self.stages if stage.io_bound()]
+
+    # Fraction of wall_clock spent waiting on disk rather than computing.
+    def io_stall_fraction(self):
+        return (self.wall_clock() - self.cpu_time()) / self.wall_clock()
+
+def cache_bytes(machine):
+    gb = machine.ram_cache_gb if machine.ram_cache_gb is not None else machine.ram_gb
+    return gb * GiB if gb is not None else float('inf')
+
+def io_time(machine, sequential_bytes, random_reads):
+    sequential = sequential_bytes / (machine.disk_throughput_gb * 10**9) if machine.disk_throughput_gb else 0
+    random = random_reads / machine.disk_iops if machine.disk_iops else 0
+    return sequential + random
+
+# Storage I/O of sealing one of zigzag's sectors on machine (default: the instance's).
+def seal_io(zigzag, machine=None):
+    machine = machine or zigzag.instance.machine
+    size = zigzag.sector_size()
+    nodes = zigzag.nodes(size)
+    layers = zigzag.security.layers
+    trees = layers + 1
+    tree = zigzag.merkle_tree(size)
+    cache = cache_bytes(machine)
+
+    layer_bytes = float(size)
+    tree_bytes = float(tree.hash_count() * zigzag.node_size)
+    layers_cached = 2 * layer_bytes <= cache
+    trees_cached = trees * tree_bytes <= cache
+    replica_cached = trees * (layer_bytes + tree_bytes) <= cache
+
+    (encoding_time, tree_core_seconds) = replication_split(zigzag, size)
+    speedup = merkle.merkle_cost(nodes, zigzag.merkle_hash, machine, trees=trees, node_size=zigzag.node_size,
+                                 apex_height=zigzag.apex_height).parallel_speedup()
+
+    def stage(name, cpu_time, bytes_read, bytes_written, random_reads):
+        return StageIO(name, cpu_time, bytes_read, bytes_written, random_reads,
+                       io_time(machine, bytes_read + bytes_written, random_reads), zigzag.node_size)
+
+    encode = stage('encode', encoding_time, layer_bytes, layers * layer_bytes,
+                   0 if layers_cached else nodes * zigzag.degree() * layers)
+    build = stage('tree', tree_core_seconds * trees / speedup, 0 if layers_cached else trees * layer_bytes,
+                  trees * tree_bytes, 0)
+
+    openings = zigzag.total_challenges() * (zigzag.degree() + 2)
+    if replica_cached:
+        vanilla_reads = 0
+    elif trees_cached:
+        vanilla_reads = openings # just the nodes; their paths are in RAM
+    else:
+        vanilla_reads = openings * (tree.proof_hashes() + 1)
+    vanilla = stage('vanilla', zigzag.vanilla_proving_time(size) / (machine.cores or 1), 0, 0, vanilla_reads)
+
+    return SealIO(size, cache, layer_bytes, tree_bytes, layers_cached, trees_cached, replica_cached,
+                  [encode, build, vanilla])
@@ -0,0 +1,130 @@
+"""On-disk store for sweep results.
+
+Each result is a NumPy structured array (one field per column) saved as `<key>.npy`, with a `<key>.json` sidecar for
+metadata. The key is a hash of the model parameters which produced the result, and of the source of the modules which
+compute results, so a stored result is found again from the same parameters until the model changes. Results are
+re-opened memory-mapped: only the columns (and pages) actually read are loaded.
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+
+import proofs
+import solver
+import sweep as sweep_module
+from perf_data import filecoin_zigzag
+from proofs import PerformanceArray, filecoin_scaling_requirements
+from sweep import SweepTable, sweep, default_metrics
+
+model_modules = (proofs, solver, sweep_module) # whose code computes stored results
+
+def _model_version():
+    digest = hashlib.sha256()
+    for module in model_modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+model_version = _model_version()
+
+# value as plain JSON data, independent of reprs: dataclasses by class name and fields, floats exactly.
+def _canonical(value):
+    if is_dataclass(value):
+        return {'class': type(value).__name__,
+                'fields': {f.name: _canonical(getattr(value, f.name)) for f in fields(value)}}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for (k, v) in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return value.hex() if math.isfinite(value) else repr(value)
+    if callable(value):
+        return f'{value.__module__}.{value.__qualname__}'
+    raise TypeError(f"cannot key on {type(value).__name__}")
+
+def parameters_key(*parameters):
+    data = json.dumps([model_version, _canonical(parameters)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode()).hexdigest()[:32]
+
+class ResultStore:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, extension='.npy'):
+        return os.path.join(self.directory, key + extension)
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def save(self, key, columns, metadata=None):
+        """Save columns (name -> 1-d array, all the same length) under key."""
+        columns = {name: np.asarray(values) for (name, values) in columns.items()}
+        length = len(next(iter(columns.values()))) if columns else 0
+        result = np.empty(length, dtype=[(name, values.dtype) for (name, values) in columns.items()])
+        for (name, values) in columns.items():
+            result[name] = values
+
+        # Write then rename, so readers never see a partial file.
+        tmp = self.path(key, '.tmp.npy')
+        np.save(tmp, result)
+        with open(self.path(key, '.json.tmp'), 'w') as f:
+            json.dump(metadata or {}, f)
+        os.replace(self.path(key, '.json.tmp'), self.path(key, '.json'))
+        os.replace(tmp, self.path(key))
+
+    def load(self, key):
+        """Memory-map the structured array stored under key, or return None if there is none."""
+        if key not in self:
+            return None
+        return np.load(self.path(key), mmap_mode='r')
+
+    def metadata(self, key):
+        with open(self.path(key, '.json')) as f:
+            return json.load(f)
+
+    ############################################################################
+
+    # zigzag.performance_array(sizes), stored.
+    def performance_array(self, zigzag, sizes):
+        sizes = np.asarray(sizes, dtype=np.float64)
+        key = parameters_key('performance_array', zigzag, sizes.tolist())
+        result = self.load(key)
+        if result is None:
+            performance = zigzag.performance_array(sizes)
+            self.save(key, {'sizes': performance.sizes,
+                            'replication_time': performance.replication_time,
+                            'total_proving_time': performance.total_proving_time,
+                            'total_seal_time': performance.total_seal_time,
+                            'proof_size': performance.proof_size},
+                      {'clock_speed_ghz': performance.clock_speed_ghz, 'description': zigzag.description()})
+            return performance
+
+        return PerformanceArray(result['sizes'], result['replication_time'], result['total_proving_time'],
+                                result['total_seal_time'], result['proof_size'],
+                                self.metadata(key)['clock_speed_ghz'])
+
+    # sweep.sweep(axes, ...), stored. Columns of the returned SweepTable are memory-mapped.
+    def sweep(self, axes, *, base=filecoin_zigzag, requirements=filecoin_scaling_requirements,
+              metrics=default_metrics, **kwargs):
+        axes = {name: list(values) for (name, values) in axes.items()}
+        key = parameters_key('sweep', axes, base, requirements, [m.__name__ for m in metrics])
+        result = self.load(key)
+        if result is None:
+            table = sweep(axes, base=base, requirements=requirements, metrics=metrics, **kwargs)
+            self.save(key, table.columns, {'axes': {name: [repr(v) for v in values] for (name, values) in axes.items()}})
+            result = self.load(key)
+
+        return SweepTable(axes, {name: result[name] for name in result.dtype.names})
@@ -0,0 +1,193 @@
+"""Streaming pipelines over model evaluations.
+
+A pipeline is a source of records (dicts), passed through stages, into a sink. Sources and stages are generators, so
+records are produced one at a time as the sink asks for them: a pipeline over a grid of any size runs in constant
+memory, and stops evaluating as soon as the sink (or a stage such as `take` or `take_while`) stops asking.
+
+    from proofs import GiB, filecoin_scaling_requirements as req
+    records = pipeline(grid({'partitions': [1, 2, 4, 8], 'apex_height': [0, 10, 15]}),
+                       at_sizes(range(1, 1024, 16), unit=GiB),
+                       performance(),
+                       meets(req),
+                       take(1000))
+    write_csv(records, 'results.csv', ['partitions', 'apex_height', 'size', 'total_seal_time', 'proof_size'])
+
+Each record carries the grid point's axis values, the 'zigzag' evaluated, and whatever columns stages add.
+"""
+
+import csv
+import itertools
+import os
+
+import numpy as np
+
+import solver
+import sweep
+from perf_data import filecoin_zigzag
+
+def pipeline(source, *stages):
+    for stage in stages:
+        source = stage(source)
+    return source
+
+################################################################################
+# Sources
+
+# One record per point of the cartesian product of axes (as in sweep.sweep), each with its zigzag built lazily.
+def grid(axes, base=filecoin_zigzag):
+    names = list(axes)
+    for values in itertools.product(*axes.values()):
+        point = dict(zip(names, values))
+        yield dict(point, zigzag=sweep.make_zigzag(point, base))
+
+# One record per size for a single zigzag.
+def sizes(zigzag, sizes, unit=1):
+    for size in sizes:
+        yield {'zigzag': zigzag, 'size': size * unit}
+
+# One record per grid point, with sweep metrics evaluated in worker processes by sweep.iter_sweep. Records carry axis
+# values and one column per metric, but no zigzag.
+def sweep_records(axes, **kwargs):
+    axes = {name: list(values) for (name, values) in axes.items()}
+    names = [metric.__name__ for metric in kwargs.get('metrics', sweep.default_metrics)]
+    for (indices, results) in sweep.iter_sweep(axes, **kwargs):
+        for (index, row) in zip(indices, results):
+            record = {name: values[i] for ((name, values), i) in zip(axes.items(), index)}
+            record.update(zip(names, row.tolist()))
+            yield record
+
+################################################################################
+# Stages: each takes keyword configuration and returns a function from records to records.
+
+# Repeat each record once per size (in units of unit), setting 'size'.
+def at_sizes(sizes, unit=1):
+    def stage(records):
+        for record in records:
+            for size in sizes:
+                yield dict(record, size=size * unit)
+    return stage
+
+# Set column name to fn(record).
+def apply(name, fn):
+    def stage(records):
+        for record in records:
+            yield dict(record, **{name: fn(record)})
+    return stage
+
+# Set 'performance' to zigzag.performance(size), and its 'total_seal_time' (per GiB), 'total_seal_cycles' and
+# 'proof_size' (per GiB) columns.
+def performance():
+    def stage(records):
+        for record in records:
+            p = record['zigzag'].performance(record.get('size') or record['zigzag'].sector_size())
+            yield dict(record, performance=p, total_seal_time=p.total_seal_time,
+                       total_seal_cycles=p.total_seal_cycles(), proof_size=p.proof_size)
+    return stage
+
+# Set 'minimum_viable_sector_size' (None when requirements cannot be met).
+def minimum_viable_sector_size(requirements, granularity=None):
+    def stage(records):
+        for record in records:
+            mvs = solver.minimum_viable_sector_size(record['zigzag'], requirements, granularity).sector_size
+            yield dict(record, minimum_viable_sector_size=mvs)
+    return stage
+
+def where(predicate):
+    def stage(records):
+        return (record for record in records if predicate(record))
+    return stage
+
+# Keep records whose zigzag meets requirements at the record's size.
+def meets(requirements):
+    return where(lambda record: record['zigzag'].meets_performance_requirements(
+        record.get('size') or record['zigzag'].sector_size(), requirements))
+
+# Stop after n records.
+def take(n):
+    return lambda records: itertools.islice(records, n)
+
+# Stop at the first record for which predicate is false.
+def take_while(predicate):
+    return lambda records: itertools.takewhile(predicate, records)
+
+################################################################################
+# Sinks: each consumes records.
+
+# Write columns of records as CSV rows to path (or an open file). Returns the number of rows written.
+def write_csv(records, path, columns):
+    def write(f):
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        rows = 0
+        for record in records:
+            writer.writerow([record.get(column) for column in columns])
+            rows += 1
+        return rows
+
+    if hasattr(path, 'write'):
+        return write(path)
+    with open(path, 'w', newline='') as f:
+        return write(f)
+
+# Append numeric columns of records to raw float64 files in directory (one `<column>.f8` file per column), chunksize
+# rows at a time. Returns the number of rows written. Read back, memory-mapped, with read_columns.
+def write_columns(records, directory, columns, chunksize=4096):
+    records = iter(records)
+    os.makedirs(directory, exist_ok=True)
+    files = {column: open(os.path.join(directory, column + '.f8'), 'wb') for column in columns}
+    rows = 0
+    try:
+        while True:
+            chunk = list(itertools.islice(records, chunksize))
+            if not chunk:
+                return rows
+            for (column, f) in files.items():
+                values = [record.get(column) for record in chunk]
+                np.array([np.nan if v is None else v for v in values], dtype=np.float64).tofile(f)
+            rows += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+def read_columns(directory, columns):
+    return {column: np.memmap(os.path.join(directory, column + '.f8'), dtype=np.float64, mode='r')
+            if os.path.getsize(os.path.join(directory, column + '.f8')) else np.empty(0)
+            for column in columns}
+
+# Fold records into a single value: fn(accumulator, record) for each record.
+def reduce(records, fn, initial):
+    accumulator = initial
+    for record in records:
+        accumulator = fn(accumulator, record)
+    return accumulator
+
+# The record minimizing key, or None if there are no records.
+def best(records, key):
+    return min(records, key=key, default=None)
+
+# Plot column y against column x on axis as records arrive, redrawing every `every` records. Returns the number of
+# records plotted. Only the current batch is held here; matplotlib keeps the plotted points.
+def live_plot(records, x, y, axis=None, every=100, style='-', **kwargs):
+    import matplotlib.pyplot as plt
+    axis = axis or plt.gca()
+    records = iter(records)
+    last = None
+    count = 0
+    while True:
+        batch = list(itertools.islice(records, every))
+        if not batch:
+            return count
+        xs = [record[x] for record in batch]
+        ys = [record[y] if record[y] is not None else np.nan for record in batch]
+        if last:
+            # Join each batch to the previous one.
+            xs.insert(0, last[0])
+            ys.insert(0, last[1])
+        (line,) = axis.plot(xs, ys, style, **kwargs)
+        # Later batches continue the same line.
+        kwargs.pop('label', None)
+        kwargs['color'] = line.get_color()
+        last = (xs[-1], ys[-1])
+        count += len(batch)
+        if plt.isinteractive():
+            plt.pause(0.001)
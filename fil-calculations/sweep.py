@@ -0,0 +1,146 @@
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+
+import solver
+from perf_data import filecoin_zigzag
+from proofs import ZigZag, Security, filecoin_scaling_requirements, replace_security
+
+security_fields = {f.name for f in fields(Security)}
+zigzag_fields = {f.name for f in fields(ZigZag)}
+
+################################################################################
+# Metrics: module-level functions of (zigzag, requirements), so they can be sent to worker processes.
+
+def seal_time_per_GiB(zigzag, requirements):
+    return zigzag.performance(zigzag.sector_size()).total_seal_time
+
+def total_seal_time(zigzag, requirements):
+    return zigzag.total_seal_time()
+
+def proof_size(zigzag, requirements):
+    return zigzag.proof_size()
+
+def minimum_viable_sector_size(zigzag, requirements):
+    mvs = solver.minimum_viable_sector_size(zigzag, requirements).sector_size
+    return np.nan if mvs is None else mvs
+
+default_metrics = (seal_time_per_GiB, total_seal_time, proof_size, minimum_viable_sector_size)
+
+################################################################################
+
+# Build the ZigZag for one point of the grid: a dict from axis name to value.
+# Axis names may be any Security or ZigZag field. merkle_hash is applied with scaled_for_new_hash when an instance is
+# present, so that instance constraints and proving time are scaled too.
+def make_zigzag(point, base):
+    security_changes = {k: v for (k, v) in point.items() if k in security_fields}
+    zigzag_changes = {k: v for (k, v) in point.items() if k in zigzag_fields}
+    unknown = set(point) - security_fields - zigzag_fields
+    assert not unknown, f"unknown sweep axes: {unknown}"
+
+    new_hash = zigzag_changes.pop('merkle_hash', None)
+    instance = zigzag_changes.get('instance', base.instance)
+    if instance:
+        zigzag_changes['size'] = None # Illegal to pass with an instance, so let it default.
+    if security_changes:
+        zigzag_changes['security'] = replace_security(zigzag_changes.get('security', base.security), **security_changes)
+
+    zigzag = replace(base, **zigzag_changes)
+    if new_hash is not None and new_hash != zigzag.merkle_hash:
+        zigzag = zigzag.scaled_for_new_hash(new_hash) if instance else replace(zigzag, merkle_hash=new_hash)
+    return zigzag
+
+@dataclass
+class SweepTable:
+    """Columnar sweep results: one integer index column per axis, one float column per metric."""
+    axes: dict # axis name -> list of values
+    columns: dict # column name -> np.ndarray
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    # Axis values (rather than indices) for every row.
+    def values(self, axis):
+        return [self.axes[axis][i] for i in self.columns[axis]]
+
+    def point(self, row):
+        return {name: values[self.columns[name][row]] for (name, values) in self.axes.items()}
+
+################################################################################
+# Worker state. Axes, base model and metrics are sent once per worker (via the pool initializer), after which each
+# task is only a (start, stop) range of flat grid indices.
+
+_worker = {}
+
+def _init_worker(axes, base, requirements, metrics):
+    _worker.update(names=list(axes), values=[list(v) for v in axes.values()], base=base,
+                   requirements=requirements, metrics=metrics)
+
+def _evaluate_chunk(bounds):
+    (start, stop) = bounds
+    names, values = _worker['names'], _worker['values']
+    shape = tuple(len(v) for v in values)
+    indices = np.array(np.unravel_index(np.arange(start, stop), shape)).T.reshape(stop - start, len(shape))
+    results = np.empty((stop - start, len(_worker['metrics'])))
+
+    for (row, index) in enumerate(indices):
+        point = {name: axis_values[i] for (name, axis_values, i) in zip(names, values, index)}
+        zigzag = make_zigzag(point, _worker['base'])
+        results[row] = [metric(zigzag, _worker['requirements']) for metric in _worker['metrics']]
+
+    return (indices, results)
+
+def _chunks(total, chunksize):
+    return ((start, min(start + chunksize, total)) for start in range(0, total, chunksize))
+
+# Evaluate metrics over the cartesian product of axes, yielding (indices, results) arrays for each chunk of the grid in
+# grid order. max_workers=0 evaluates in this process.
+def iter_sweep(axes, *, base=filecoin_zigzag, requirements=filecoin_scaling_requirements, metrics=default_metrics,
+               max_workers=None, chunksize=None):
+    total = int(np.prod([len(v) for v in axes.values()]))
+    workers = os.cpu_count() if max_workers is None else max_workers
+    # Several chunks per worker balances load without paying per-point task overhead.
+    chunksize = chunksize or max(1, min(10000, total // (max(workers, 1) * 4) or 1))
+    initargs = (axes, base, requirements, metrics)
+
+    if workers == 0:
+        _init_worker(*initargs)
+        for bounds in _chunks(total, chunksize):
+            yield _evaluate_chunk(bounds)
+    else:
+        # Keep only a few chunks in flight (rather than submitting the whole grid, as executor.map would), so that
+        # memory stays bounded, and a consumer which stops early does not wait for the rest of the grid.
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            pending = collections.deque()
+            try:
+                for bounds in _chunks(total, chunksize):
+                    pending.append(executor.submit(_evaluate_chunk, bounds))
+                    if len(pending) >= 2 * workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+# Evaluate metrics over the cartesian product of axes, and collect the results into a SweepTable.
+# Example:
+#   sweep({'instance': [projected_instance, x1e32_xlarge_64], 'merkle_hash': [pedersen, blake2s, pb50],
+#          'partitions': [1, 2, 4, 8], 'apex_height': [0, 10, 15]})
+def sweep(axes, **kwargs):
+    axes = {name: list(values) for (name, values) in axes.items()}
+    metrics = kwargs.get('metrics', default_metrics)
+    indices, results = [], []
+    for (chunk_indices, chunk_results) in iter_sweep(axes, **kwargs):
+        indices.append(chunk_indices)
+        results.append(chunk_results)
+
+    indices = np.concatenate(indices) if indices else np.empty((0, len(axes)), dtype=np.int64)
+    results = np.concatenate(results) if results else np.empty((0, len(metrics)))
+
+    columns = {name: indices[:, i] for (i, name) in enumerate(axes)}
+    columns.update({metric.__name__: results[:, i] for (i, metric) in enumerate(metrics)})
+    return SweepTable(axes, columns)
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+import apex
+import graph
+
+@pytest.mark.parametrize('zigzag', [apex.z, apex.x, apex.xx], ids=['without instance', 'instance', 'blake2s'])
+def test_apex_seal_times_match_zigzag(zigzag):
+    heights = np.concatenate(([0], apex.candidate_apex_heights(zigzag)))
+    expected = [apex.apex(zigzag, int(h)).total_seal_time() for h in heights]
+    assert np.allclose(apex.apex_seal_times(zigzag, heights), expected, rtol=1e-9)
+
+@pytest.mark.parametrize('zigzag', [apex.z, apex.x], ids=['without instance', 'instance'])
+def test_vectorized_optimum_matches_loop(zigzag):
+    assert apex.optimal_apex_vectorized(zigzag) == apex.optimal_apex_loop(zigzag, apex.apex)
+
+def test_apex_examples_match_graph():
+    for zigzag in (apex.a, apex.y):
+        assert graph.discrepancies(zigzag) == {}
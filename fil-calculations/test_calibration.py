@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+import calibration
+from calibration import Sample, fit
+
+def test_fit_recovers_coefficients():
+    truth = calibration.ProvingTimeModel((2e5, 300.0), 0, 0)
+    samples = [Sample(n, p, cores, 3.0, float(truth.core_seconds(n, p, cores, 3.0)))
+               for (n, p, cores) in [(1e7, 1, 1), (1e8, 2, 8), (5e8, 8, 64), (3e7, 4, 14)]]
+    model = fit(samples)
+    assert np.allclose(model.coefficients, truth.coefficients)
+    assert model.relative_rms_error == pytest.approx(0, abs=1e-9)
+
+def test_perf_data_calibration():
+    model = calibration.calibrate()
+    assert len(model.coefficients) == len(calibration.feature_names)
+    assert all(c > 0 for c in model.coefficients)
+    for sample in calibration.perf_data_samples():
+        predicted = model.core_seconds(sample.constraints, sample.partitions, sample.cores, sample.clock_speed_ghz)
+        assert predicted == pytest.approx(sample.core_seconds, rel=0.35)
+    assert 0 < model.serial_fraction(1e8) < 1
@@ -0,0 +1,42 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from cost import cost_array, cost_by_hash, fleet_cost
+from perf_data import filecoin_zigzag
+from proofs import Config, GiB, TiB, blake2s, pedersen
+from schedule import simulate
+
+machine = replace(filecoin_zigzag.instance.machine, cores=64, hourly_cost=26.688)
+
+def test_cost_array_prices_core_seconds():
+    sizes = [64 * GiB, 256 * GiB]
+    cost = cost_array(filecoin_zigzag, sizes, machine, machine)
+    seal_time = filecoin_zigzag.performance_array(sizes).total_seal_time * np.array(sizes) / GiB
+    expected = seal_time / (64 * 60 * 60) * 26.688 * TiB / np.array(sizes)
+    assert np.allclose(cost.dollars_per_TiB, expected)
+    assert np.allclose(cost.replication_hours + cost.proving_hours, seal_time / (64 * 60 * 60))
+    assert np.all(cost.kWh_per_TiB > 0)
+
+def test_unpriced_machines_give_nan():
+    cost = cost_array(filecoin_zigzag, None, replace(machine, hourly_cost=None), machine)
+    assert np.isnan(cost.dollars_per_TiB).all()
+    assert cost.sizes.tolist() == [filecoin_zigzag.sector_size()]
+
+def test_cost_by_hash():
+    costs = cost_by_hash(filecoin_zigzag, [pedersen, blake2s], None, machine, machine)
+    assert set(costs) == {pedersen, blake2s}
+    unchanged = cost_array(filecoin_zigzag, None, machine, machine)
+    assert np.allclose(costs[pedersen].dollars_per_TiB, unchanged.dollars_per_TiB)
+    assert not np.allclose(costs[blake2s].dollars_per_TiB, unchanged.dollars_per_TiB)
+
+def test_fleet_cost_charges_idle_machines():
+    config = Config(replication_machine=machine, proving_machine=machine, zigzag=filecoin_zigzag)
+    result = simulate(config, sectors=4)
+    fleet = fleet_cost(result, config)
+    busy = cost_array(filecoin_zigzag, None, machine, machine)
+    assert fleet.dollars_per_TiB >= busy.dollars_per_TiB[0]
+    # Energy only counts busy cores, so it matches the busy cost.
+    assert fleet.kWh_per_TiB == pytest.approx(busy.kWh_per_TiB[0])
+    assert fleet.TiB_per_day == pytest.approx(result.bytes_per_day() / TiB)
@@ -0,0 +1,27 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import graph
+from proofs import GiB
+
+@pytest.mark.parametrize('zigzag', graph.schema_examples(), ids=lambda z: str(graph.schema(z)))
+@pytest.mark.parametrize('partitions', [1, 8, 64])
+def test_graph_matches_zigzag(zigzag, partitions):
+    zigzag = replace(zigzag, partitions=partitions, size=None if zigzag.instance else zigzag.size)
+    assert graph.discrepancies(zigzag) == {}
+
+def test_evaluation_update_matches_fresh_evaluation():
+    zigzag = graph.schema_examples()[2]
+    evaluation = graph.Evaluation.of(zigzag)
+    evaluation.update({'partitions': 4})
+    fresh = graph.evaluate(replace(zigzag, partitions=4))
+    for name in graph.metric_names:
+        assert np.isclose(evaluation[name], fresh[name])
+
+def test_graph_broadcasts_over_sizes():
+    zigzag = graph.schema_examples()[2]
+    sizes = np.array([1, 4, 64]) * GiB
+    seal_times = graph.evaluate(zigzag, sizes)['total_seal_time']
+    assert np.allclose(seal_times, [zigzag.total_seal_time(size) for size in sizes])
@@ -0,0 +1,25 @@
+from dataclasses import replace
+
+import numpy as np
+
+import hybrid
+import perf_data
+from proofs import blake2s, filecoin_scaling_requirements, hybrid_hash, pedersen
+
+zigzag = replace(perf_data.filecoin_zigzag, relax_time=2, size=None)
+
+def test_fixed_ratio_hybrids():
+    hybrids = zigzag.minimum_viable_sector_size_for_hybrids(filecoin_scaling_requirements)
+    assert np.allclose([r for (r, _) in hybrids], np.linspace(0, 1, 11))
+    assert hybrids[-1] == (1.0, '256.0 GiB')
+
+def test_optimal_hybrid_is_no_worse_than_fixed_ratios():
+    (_, size) = zigzag.optimal_hybrid_minimum_viable_sector_size(filecoin_scaling_requirements)
+    fixed = [zigzag.scaled_for_new_hash(hybrid_hash(pedersen, blake2s, r / 10))
+             .minimum_viable_sector_size(filecoin_scaling_requirements) for r in range(11)]
+    assert size <= min(s for s in fixed if s is not None)
+
+def test_golden_section_finds_interior_minimum():
+    (x, value, evaluations) = hybrid.golden_section_minimize(lambda x: (x - 0.3) ** 2, tolerance=1e-4)
+    assert abs(x - 0.3) < 1e-3
+    assert evaluations <= 40
@@ -0,0 +1,39 @@
+import pytest
+
+from ingest import Catalog, elapsed_seconds, parse_runs, parse_timestamp, record_instance, run_record
+from perf_data import ec2_x1e32_xlarge_machine
+
+command = ('./target/release/examples/zigzag --m 5 --expansion 8 --layers 10 --challenges 333 --taper-layers 7 '
+           '--taper 0.3 --size 67108864 --groth --no-bench --partitions 8')
+
+def log(parameters_at, proof_at):
+    return [command,
+            'Mar 17 13:34:46.701 INFO replication_time/GiB: 2018.63462912s, target: stats',
+            'Mar 18 22:18:19.128 INFO circuit_num_constraints: 879643632, target: stats',
+            f'{parameters_at} INFO groth_parameter_bytes: 393715971000, target: stats',
+            f'{proof_at} INFO groth_proving_time: 29307.162513139s seconds, target: stats',
+            'Mar 18 06:00:00.000 INFO vanilla_proving_time: 0.497 seconds, target: stats']
+
+def test_leap_day():
+    assert parse_timestamp('Feb 29 12:00:00.5').day == 29
+    assert elapsed_seconds(parse_timestamp('Feb 28 23:00:00'), parse_timestamp('Feb 29 01:00:00')) == 2 * 60 * 60
+
+def test_new_year_rollover():
+    assert elapsed_seconds(parse_timestamp('Dec 31 23:00:00'), parse_timestamp('Jan  1 01:00:00')) == 2 * 60 * 60
+
+def test_run_over_leap_day_and_new_year(tmp_path):
+    path = tmp_path / 'zigzag.log'
+    path.write_text('\n'.join(log('Dec 31 22:00:00', 'Jan  1 02:00:00') + log('Feb 29 21:49:57', 'Mar  1 05:58:25')))
+    catalog = Catalog()
+    assert catalog.ingest(path, ec2_x1e32_xlarge_machine) == 2
+    (over_new_year, over_leap_day) = catalog.records
+    assert over_new_year['groth_proving_time'] == 4 * 60 * 60 * 64
+    assert over_leap_day['groth_proving_time'] == (8 * 60 * 60 + 8 * 60 + 28) * 64
+
+def test_record_instance():
+    (run,) = parse_runs(log('Mar 17 21:49:57.881', 'Mar 18 05:58:25.047'))
+    instance = record_instance(run_record(run, ec2_x1e32_xlarge_machine, 'x1e32.xlarge'))
+    assert instance.constraints == 879643632
+    assert instance.partitions == 8
+    assert instance.security.total_challenges == 1716
+    assert instance.groth_proving_time == pytest.approx(29307.166 * 64, rel=1e-6)
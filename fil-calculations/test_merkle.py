@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from merkle import level_hash_counts, level_hybrid, merkle_cost, zigzag_merkle_cost
+from perf_data import filecoin_zigzag
+from proofs import Machine, MerkleTree, blake2s, pedersen
+
+nodes = 2**20
+
+def test_level_hash_counts():
+    counts = level_hash_counts(nodes)
+    assert len(counts) == 20 and counts[0] == nodes / 2 and counts[-1] == 1
+    assert counts.sum() == nodes - 1
+    assert level_hash_counts(5).tolist() == [3, 2, 1]
+
+@pytest.mark.parametrize('apex_height', [2, 5, 10])
+def test_apex_skips_the_apex_hashes(apex_height):
+    skipped = level_hash_counts(nodes).sum() - level_hash_counts(nodes, apex_height).sum()
+    assert skipped == MerkleTree.apex_count(apex_height)
+
+def test_single_core_wall_clock_is_core_seconds():
+    cost = merkle_cost(nodes, pedersen, Machine(3.0, cores=1), trees=3)
+    assert cost.core_seconds() == pytest.approx(3 * (nodes - 1) * pedersen.hash_time)
+    assert cost.wall_clock() == pytest.approx(cost.core_seconds())
+
+def test_cores_speed_up_until_levels_run_out_of_hashes():
+    cost = merkle_cost(nodes, pedersen, Machine(3.0, cores=16))
+    assert 1 < cost.parallel_speedup() < 16
+    # The top levels have fewer hashes than cores.
+    assert cost.level_wall_clock[-1] == cost.level_core_seconds[-1]
+
+def test_memory_bandwidth_bounds_fast_hashes():
+    slow_memory = Machine(3.0, cores=64, memory_bandwidth_gb=0.1)
+    cost = merkle_cost(nodes, blake2s, slow_memory)
+    assert cost.level_memory_bound[0]
+    assert cost.tree_wall_clock() > merkle_cost(nodes, blake2s, Machine(3.0, cores=64)).tree_wall_clock()
+
+def test_hybrid_levels():
+    levels = level_hybrid(pedersen, blake2s, 3, 20)
+    assert levels[:17] == [pedersen] * 17 and levels[17:] == [blake2s] * 3
+    hybrid = merkle_cost(nodes, levels, Machine(3.0, cores=1))
+    assert merkle_cost(nodes, blake2s, Machine(3.0, cores=1)).core_seconds() < hybrid.core_seconds() < \
+           merkle_cost(nodes, pedersen, Machine(3.0, cores=1)).core_seconds()
+
+def test_zigzag_builds_a_tree_per_layer_and_the_data():
+    cost = zigzag_merkle_cost(filecoin_zigzag)
+    assert cost.trees == filecoin_zigzag.security.layers + 1
+    assert cost.level_hashes.sum() == filecoin_zigzag.nodes(filecoin_zigzag.sector_size()) - 1
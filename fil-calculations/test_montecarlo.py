@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+import graph
+import montecarlo
+from montecarlo import LogNormal, Uniform, simulate
+from perf_data import filecoin_zigzag
+
+@pytest.mark.parametrize('apex', [False, True])
+def test_ignored_fields_are_unused_with_an_instance(apex):
+    used = set().union(*(graph.dependencies(name, graph.Schema(True, apex)) for name in graph.metric_names))
+    assert not used & set(montecarlo.ignored_with_instance)
+
+def test_sampling_ignored_field_warns_and_is_skipped():
+    distributions = {'instance.groth_acceleration': Uniform(1, 4), 'merkle_pessimization': Uniform(1, 100)}
+    with pytest.warns(UserWarning, match='merkle_pessimization'):
+        result = simulate(filecoin_zigzag, distributions, samples=100, seed=1)
+    expected = simulate(filecoin_zigzag, {'instance.groth_acceleration': Uniform(1, 4)}, samples=100, seed=1)
+    assert np.array_equal(result.samples['total_seal_time'], expected.samples['total_seal_time'])
+
+def test_samples_spread_around_the_model():
+    distributions = {'instance.encoding_replication_time_per_GiB': LogNormal(2018, 0.2)}
+    result = simulate(filecoin_zigzag, distributions, samples=1000, seed=1, batch_size=300)
+    assert len(result) == 1000
+    (low, median, high) = result.percentiles()['total_seal_time']
+    assert low < filecoin_zigzag.total_seal_time() < high
@@ -0,0 +1,34 @@
+import itertools
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import pareto
+from perf_data import filecoin_zigzag
+from proofs import GiB, blake2s, pb50, pedersen
+from sweep import make_zigzag
+
+axes = {'merkle_hash': [pedersen, blake2s, pb50], 'partitions': [1, 2, 4, 8], 'apex_height': [0, 10]}
+sizes = [2**k for k in range(28, 41, 2)]
+bases = {'instance': filecoin_zigzag, 'no instance': replace(filecoin_zigzag, instance=None, size=64 * GiB)}
+
+# Front of every configuration at every size, without pruning.
+def exhaustive_front(base):
+    values = np.concatenate([pareto.objectives(make_zigzag(dict(zip(axes, point)), base), sizes)
+                             for point in itertools.product(*axes.values())])
+    return values[pareto.pareto_mask(values)]
+
+def rows(values):
+    return sorted(map(tuple, np.asarray(values)))
+
+@pytest.mark.parametrize('base', list(bases.values()), ids=list(bases))
+def test_pruned_frontier_matches_exhaustive_front(base):
+    frontier = pareto.frontier(axes, base=base, sizes=sizes)
+    assert frontier.configurations == 24
+    assert rows(frontier.values()) == rows(exhaustive_front(base))
+
+def test_pareto_mask():
+    # Equal rows dominate neither each other.
+    values = np.array([[1, 2], [2, 1], [2, 2], [1, 2], [3, 0]])
+    assert list(pareto.pareto_mask(values)) == [True, True, False, True, True]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import partitions
+from partitions import plan_partitions, proving_wall_clock, with_partitions
+from perf_data import filecoin_zigzag
+
+counts = [1, 2, 4, 8, 16, 32, 64]
+
+def test_with_partitions_updates_the_instance_together():
+    instance = filecoin_zigzag.instance
+    for p in counts:
+        zigzag = with_partitions(filecoin_zigzag, p)
+        assert zigzag.partitions == zigzag.instance.partitions == p
+        assert zigzag.instance.constraints == pytest.approx(instance.constraints * instance.partitions / p, abs=1)
+        assert zigzag.instance.security.total_challenges == pytest.approx(
+            instance.security.total_challenges * instance.partitions / p)
+
+def test_with_partitions_keeps_total_work_and_shrinks_circuits():
+    zigzags = [with_partitions(filecoin_zigzag, p) for p in counts]
+    times = [z.groth_proving_time() for z in zigzags]
+    assert np.allclose(times, times[0], rtol=1e-6)
+    assert all(np.diff([z.groth_proving_memory() for z in zigzags]) < 0)
+
+def test_own_partitions_leave_the_instance_unchanged():
+    assert with_partitions(filecoin_zigzag, filecoin_zigzag.instance.partitions).instance == filecoin_zigzag.instance
+
+def test_concurrency_helps_only_with_serial_work():
+    assert proving_wall_clock(100, 4, 4, 4, 0) == pytest.approx(proving_wall_clock(100, 4, 1, 4, 0))
+    assert proving_wall_clock(100, 4, 4, 4, 0.5) < proving_wall_clock(100, 4, 1, 4, 0.5)
+
+def test_plan_fits_in_ram():
+    plan = plan_partitions(filecoin_zigzag, serial_fraction=0.1)
+    ram = filecoin_zigzag.instance.machine.ram_gb * partitions.GiB
+    assert plan.peak_memory <= ram
+    assert plan_partitions(filecoin_zigzag, serial_fraction=0.1, ram_fraction=1e-9) is None
@@ -0,0 +1,24 @@
+"""Pinned projections from perf_data. A change to these numbers is a change to the published model: update them only
+in a commit explaining why."""
+
+import pytest
+
+import perf_data
+from proofs import GiB, ZigZag
+
+def test_filecoin_zigzag_projection():
+    zigzag = perf_data.filecoin_zigzag
+    assert zigzag.performance(64 * GiB).total_seal_time == pytest.approx(118471.44144650162, rel=1e-9)
+    assert zigzag.groth_proving_time() == pytest.approx(227369.54783687167, rel=1e-9)
+    assert zigzag.constraints() == pytest.approx(566949800.1118882, rel=1e-9)
+
+def test_porcuquine_at_filecoin_security():
+    # The benchmark proved 50 challenges; filecoin_security_requirements needs 8848, all in the one partition.
+    zigzag = ZigZag(instance=perf_data.porcuquine_prover, partitions=1)
+    assert zigzag.constraints() == pytest.approx(4316010979.0, rel=1e-9)
+
+@pytest.mark.parametrize('instance', [perf_data.ec2_x1e32_xlarge, perf_data.x1e32_xlarge_64])
+def test_x1e32_benchmark_securities(instance):
+    # --challenges 333 --taper 0.3 --taper-layers 7 over 10 layers, in each of 8 partitions.
+    assert instance.security.total_challenges == 1716
+    assert instance.partitions == 8
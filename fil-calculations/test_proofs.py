@@ -0,0 +1,60 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import apex
+import graph
+import perf_data
+from proofs import ZigZag, replace_security
+
+instances = [perf_data.porcuquine_prover, perf_data.ec2_x1e32_xlarge, perf_data.x1e32_xlarge_64,
+             perf_data.projected_instance]
+partition_counts = [1, 2, 4, 8, 16, 32, 64]
+
+@pytest.mark.parametrize('instance', instances, ids=lambda i: i.description)
+@pytest.mark.parametrize('partitions', partition_counts)
+def test_constraints_time_and_memory_positive_across_partitions(instance, partitions):
+    zigzag = ZigZag(instance=instance, partitions=partitions)
+    assert zigzag.constraints() > 0
+    assert zigzag.groth_proving_time() > 0
+    assert zigzag.total_seal_time() > 0
+    assert zigzag.groth_proving_memory() > 0
+
+@pytest.mark.parametrize('partitions', partition_counts)
+def test_filecoin_zigzag_positive_across_partitions(partitions):
+    zigzag = replace(perf_data.filecoin_zigzag, partitions=partitions, size=None)
+    assert zigzag.constraints() > 0
+    assert zigzag.groth_proving_time() > 0
+    assert zigzag.groth_proving_memory() > 0
+
+def test_circuit_shrinks_with_partitions():
+    constraints = [ZigZag(instance=perf_data.x1e32_xlarge_64, partitions=p).constraints() for p in partition_counts]
+    assert all(np.diff(constraints) < 0)
+
+def test_instance_partitions_need_no_correction():
+    # The benchmark's own challenges (in each of its partitions) and partitions reproduce the benchmark.
+    instance = perf_data.x1e32_xlarge_64
+    security = replace_security(instance.security, challenges=None, taper=0, taper_layers=0,
+                                total_challenges=instance.security.total_challenges * instance.partitions)
+    zigzag = ZigZag(security=security, instance=instance, partitions=instance.partitions)
+    assert zigzag.security_constraints() == 0
+    assert zigzag.constraints() == instance.constraints
+    assert zigzag.groth_proving_time() == instance.groth_proving_time
+
+@pytest.mark.parametrize('partitions', [1, 8, 64])
+def test_graph_and_apex_agree_across_partitions(partitions):
+    zigzag = replace(perf_data.filecoin_zigzag, partitions=partitions, size=None)
+    assert graph.discrepancies(zigzag) == {}
+    assert np.isclose(apex.apex_seal_times(zigzag, [0])[0], zigzag.total_seal_time())
+
+def test_replacing_schedule_rederives_total():
+    security = perf_data.x1e32_xlarge_security
+    assert security.total_challenges == security.challenge_schedule().sum()
+    assert replace_security(security, layers=11).total_challenges == security.total_challenges + 333
+
+def test_replacing_total_replaces_schedule():
+    totals = np.array([1700.0, 1716.0, 1732.0])
+    security = replace_security(perf_data.x1e32_xlarge_security, total_challenges=totals)
+    assert security.challenges is None
+    assert np.array_equal(security.total_challenges, totals)
@@ -0,0 +1,40 @@
+import pytest
+
+from perf_data import filecoin_zigzag
+from proofs import Config
+from schedule import replication_split, simulate
+
+machine = filecoin_zigzag.instance.machine
+config = Config(replication_machine=machine, proving_machine=machine, zigzag=filecoin_zigzag)
+
+def total_work(result):
+    cores = machine.cores
+    return sum(result.utilization.values()) * cores * result.makespan
+
+def test_simulated_work_matches_total_seal_time():
+    result = simulate(config, sectors=3)
+    assert total_work(result) == pytest.approx(3 * filecoin_zigzag.total_seal_time())
+    (encoding_time, tree_core_seconds) = replication_split(filecoin_zigzag, filecoin_zigzag.sector_size())
+    assert encoding_time + tree_core_seconds * (filecoin_zigzag.security.layers + 1) == \
+           pytest.approx(filecoin_zigzag.replication_time())
+
+@pytest.mark.parametrize('tree_cores', [1, 4, 64])
+def test_utilization_is_at_most_occupancy(tree_cores):
+    result = simulate(config, sectors=4, tree_cores=tree_cores)
+    for kind in ('replication', 'proving'):
+        assert 0 < result.utilization[kind] <= result.occupancy[kind] + 1e-12
+        assert result.occupancy[kind] <= 1 + 1e-12
+
+def test_every_sector_completes():
+    result = simulate(config, sectors=5)
+    assert len(result.sector_completion_times) == 5
+    assert max(result.sector_completion_times) == result.makespan
+    # Encoding is sequential, so no sector can finish before its encoding is done.
+    (encoding_time, _) = replication_split(filecoin_zigzag, filecoin_zigzag.sector_size())
+    assert min(result.sector_completion_times) > encoding_time
+
+def test_more_machines_seal_faster():
+    one = simulate(config, sectors=8)
+    more = simulate(config, sectors=8, replication_machines=4, proving_machines=4)
+    assert more.makespan < one.makespan
+    assert more.sectors_per_day() > one.sectors_per_day()
@@ -0,0 +1,17 @@
+import numpy as np
+
+import perf_data
+from sensitivity import ranked, sensitivities
+
+def test_filecoin_zigzag_example():
+    # The module's documented example, whose instance security has a taper schedule.
+    result = sensitivities(perf_data.filecoin_zigzag)
+    top = ranked(result, 'total_seal_time')[:5]
+    assert all(np.isfinite(s.elasticity) for s in top)
+
+def test_challenge_totals_have_opposite_effects():
+    # More challenges of our own add constraints; more in the benchmark mean fewer need adding.
+    paths = ['security.total_challenges', 'instance.security.total_challenges']
+    by_path = {s.path: s for s in sensitivities(perf_data.filecoin_zigzag, paths) if s.metric == 'groth_proving_time'}
+    assert by_path['security.total_challenges'].derivative > 0
+    assert by_path['instance.security.total_challenges'].derivative < 0
@@ -0,0 +1,60 @@
+from dataclasses import replace
+
+import pytest
+
+import graph
+from perf_data import filecoin_zigzag
+from proofs import blake2s
+from session import Session, affects, changed_fields
+
+def session():
+    s = Session(filecoin_zigzag)
+    s.add('groth', lambda z: z.groth_proving_time(), depends_on=s.metric_fields('groth_proving_time'))
+    s.add('proof', lambda z: z.proof_size(), depends_on=('partitions', 'circuit_proof_size', 'hash_size'))
+    s.add('everything', lambda z: z.total_seal_time())
+    s.add('doubled', lambda z, groth: 2 * groth, depends_on=(), inputs=('groth',))
+    for name in s.results:
+        s[name]
+    return s
+
+def test_changed_fields():
+    changed = replace(filecoin_zigzag, relax_time=2, size=None)
+    assert changed_fields(filecoin_zigzag, changed) == ['relax_time']
+    assert 'instance.groth_acceleration' in changed_fields(
+        filecoin_zigzag, replace(filecoin_zigzag, size=None,
+                                 instance=replace(filecoin_zigzag.instance, groth_acceleration=2)))
+    assert affects('instance', 'instance.constraints') and affects('instance.constraints', 'instance')
+    assert not affects('instance.constraints', 'instance.constraints_x')
+
+def test_only_dependent_results_are_invalidated():
+    s = session()
+    assert s.set('relax_time', 4) == ['everything']
+    assert s.set('instance.groth_acceleration', 2) == ['groth', 'everything', 'doubled']
+    assert s.set('partitions', 4) == ['groth', 'proof', 'everything', 'doubled']
+    assert s.update(s.zigzag) == []
+
+def test_results_recompute_lazily_and_correctly():
+    s = session()
+    s.set('instance.groth_acceleration', 2)
+    assert s.results['groth'].computations == 1 and s.stale() == ['groth', 'everything', 'doubled']
+    assert s['doubled'] == 2 * s.zigzag.groth_proving_time()
+    assert s.results['groth'].computations == 2
+    assert s['doubled'] == s['doubled'] and s.results['doubled'].computations == 2
+
+def test_watched_results_recompute_eagerly():
+    s = session()
+    seen = []
+    s.watch('proof', seen.append)
+    s.set('partitions', 2)
+    s.set('relax_time', 3)
+    assert seen == [filecoin_zigzag.proof_size(), replace(filecoin_zigzag, partitions=2, size=None).proof_size()]
+
+@pytest.mark.parametrize('change', [lambda z: replace(z, partitions=3, size=None),
+                                    lambda z: z.scaled_for_new_hash(blake2s),
+                                    lambda z: replace(z, apex_height=10, size=None)])
+def test_metrics_stay_current(change):
+    s = session()
+    s.update(change(s.zigzag))
+    assert graph.discrepancies(s.zigzag) == {}
+    expected = graph.evaluate(s.zigzag)
+    assert all(s.metrics()[name] == pytest.approx(expected[name]) for name in graph.metric_names)
@@ -0,0 +1,35 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import solver
+from perf_data import filecoin_zigzag, projected_instance, x1e32_xlarge_64
+from proofs import GiB, ZigZag, blake2s, filecoin_scaling_requirements, filecoin_security_requirements
+
+relaxed = [replace(filecoin_zigzag, relax_time=relax, size=None) for relax in (1, 4, 16)]
+zigzags = relaxed + [zigzag.scaled_for_new_hash(blake2s) for zigzag in relaxed] + \
+          [ZigZag(security=filecoin_security_requirements, instance=instance, partitions=8, relax_time=4)
+           for instance in (projected_instance, x1e32_xlarge_64)]
+
+@pytest.mark.parametrize('zigzag', zigzags)
+@pytest.mark.parametrize('granularity', [None, 4 * GiB])
+def test_closed_form_matches_bisection(zigzag, granularity):
+    closed_form = solver.minimum_viable_sector_size(zigzag, filecoin_scaling_requirements, granularity)
+    bisection = solver.bisect_minimum_viable_sector_size(zigzag, filecoin_scaling_requirements, granularity)
+    assert closed_form.sector_size == bisection.sector_size
+    assert closed_form.evaluations <= bisection.evaluations
+
+def test_viable_and_infeasible_cases():
+    sizes = [solver.minimum_viable_sector_size(z, filecoin_scaling_requirements).sector_size for z in zigzags]
+    assert sizes[:6] == [None, None, 64 * GiB, 512 * GiB, 128 * GiB, 64 * GiB]
+
+def test_batch_matches_single():
+    batch = solver.minimum_viable_sector_sizes(zigzags, filecoin_scaling_requirements)
+    single = [solver.minimum_viable_sector_size(z, filecoin_scaling_requirements).sector_size for z in zigzags]
+    assert np.array_equal(batch, [np.nan if s is None else s for s in single], equal_nan=True)
+
+def test_without_instance_uses_bisection():
+    zigzag = replace(filecoin_zigzag, instance=None, size=64 * GiB)
+    solution = solver.minimum_viable_sector_size(zigzag, filecoin_scaling_requirements)
+    assert solution == solver.bisect_minimum_viable_sector_size(zigzag, filecoin_scaling_requirements)
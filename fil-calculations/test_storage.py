@@ -0,0 +1,41 @@
+from dataclasses import replace
+
+import pytest
+
+import perf_data
+from proofs import GiB, ZigZag
+from storage import seal_io
+
+zigzag = ZigZag(instance=perf_data.x1e32_xlarge_64)
+nvme = replace(perf_data.ec2_x1e32_xlarge_machine, disk_throughput_gb=2, disk_iops=4e5)
+
+def test_everything_cached():
+    seal = seal_io(zigzag, replace(nvme, ram_cache_gb=10**6))
+    assert seal.layers_fit_in_memory and seal.trees_fit_in_memory and seal.replica_fits_in_memory
+    assert seal.random_reads() == 0
+    # Only the data is read, and each layer and tree written.
+    layers = zigzag.security.layers
+    assert seal.bytes_moved() == seal.layer_bytes * (1 + layers) + seal.tree_bytes * (layers + 1)
+
+def test_less_cache_means_more_io():
+    cache_sizes = [10**6, 1024, 64, 1]
+    seals = [seal_io(zigzag, replace(nvme, ram_cache_gb=gb)) for gb in cache_sizes]
+    assert [s.replica_fits_in_memory for s in seals] == [True, False, False, False]
+    assert [s.layers_fit_in_memory for s in seals] == [True, True, False, False]
+    moved = [s.bytes_moved() for s in seals]
+    assert moved == sorted(moved)
+    io_times = [s.io_time() for s in seals]
+    assert io_times == sorted(io_times)
+
+def test_cpu_time_unaffected_by_storage():
+    fast = seal_io(zigzag, replace(nvme, ram_cache_gb=10**6))
+    slow = seal_io(zigzag, replace(nvme, ram_cache_gb=1, disk_throughput_gb=0.1, disk_iops=1e3))
+    assert fast.cpu_time() == slow.cpu_time()
+    assert slow.wall_clock() >= fast.wall_clock() and slow.io_bound_stages()
+    assert 0 <= fast.io_stall_fraction() < slow.io_stall_fraction() < 1
+
+def test_unlimited_disks_are_never_io_bound():
+    seal = seal_io(zigzag, replace(nvme, ram_cache_gb=1, disk_throughput_gb=None, disk_iops=None))
+    assert seal.io_time() == 0 and not seal.io_bound_stages()
+    assert seal.wall_clock() == pytest.approx(seal.cpu_time())
+    assert seal.sector_size == 64 * GiB
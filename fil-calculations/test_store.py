@@ -0,0 +1,52 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import store
+from perf_data import filecoin_zigzag
+from proofs import GiB, blake2s, pedersen
+from store import ResultStore, parameters_key
+
+def test_equal_parameters_share_a_key():
+    assert parameters_key('sweep', filecoin_zigzag) == parameters_key('sweep', replace(filecoin_zigzag, size=None))
+    assert parameters_key([1.0, 2.0]) == parameters_key(np.array([1.0, 2.0]))
+
+def test_any_difference_changes_the_key():
+    keys = {parameters_key('sweep', filecoin_zigzag),
+            parameters_key('performance_array', filecoin_zigzag),
+            parameters_key('sweep', replace(filecoin_zigzag, partitions=4, size=None)),
+            parameters_key('sweep', filecoin_zigzag.scaled_for_new_hash(blake2s)),
+            parameters_key(1.0), parameters_key(np.nextafter(1.0, 2)), parameters_key(1)}
+    assert len(keys) == 7
+
+def test_model_version_is_part_of_the_key(monkeypatch):
+    key = parameters_key(filecoin_zigzag)
+    monkeypatch.setattr(store, 'model_version', 'changed')
+    assert parameters_key(filecoin_zigzag) != key
+
+def test_unkeyable_values_are_rejected():
+    with pytest.raises(TypeError):
+        parameters_key(object())
+
+def test_save_and_load(tmp_path):
+    results = ResultStore(str(tmp_path))
+    results.save('k', {'a': np.arange(3), 'b': np.array([0.5, np.nan, 2])}, {'note': 'x'})
+    loaded = results.load('k')
+    assert 'k' in results and results.load('other') is None
+    assert list(loaded['a']) == [0, 1, 2] and np.isnan(loaded['b'][1])
+    assert results.metadata('k') == {'note': 'x'}
+
+def test_stored_results_are_reused(tmp_path, monkeypatch):
+    results = ResultStore(str(tmp_path))
+    axes = {'merkle_hash': [pedersen, blake2s], 'partitions': [1, 8]}
+    table = results.sweep(axes, max_workers=0)
+    sizes = [GiB, 64 * GiB]
+    performance = results.performance_array(filecoin_zigzag, sizes)
+
+    monkeypatch.setattr(store, 'sweep', None) # stored results must not be recomputed
+    again = results.sweep(axes, max_workers=0)
+    for (name, column) in table.columns.items():
+        assert np.array_equal(column, again.columns[name], equal_nan=True)
+    assert np.array_equal(results.performance_array(filecoin_zigzag, sizes).total_seal_time,
+                          performance.total_seal_time)
@@ -0,0 +1,57 @@
+import csv
+
+import numpy as np
+
+import stream
+import sweep
+from perf_data import filecoin_zigzag
+from proofs import GiB, filecoin_scaling_requirements
+from stream import apply, at_sizes, grid, performance, pipeline, take, take_while, where
+
+axes = {'partitions': [1, 2, 4, 8], 'apex_height': [0, 10]}
+
+def test_stages_only_evaluate_what_the_sink_asks_for():
+    evaluated = []
+    records = pipeline(grid(axes), at_sizes(range(1, 1000), unit=GiB),
+                       apply('seen', lambda record: evaluated.append(record['size'])), take(5))
+    assert len(list(records)) == 5
+    assert len(evaluated) == 5
+
+def test_performance_columns():
+    (record,) = pipeline(grid({'partitions': [4]}), at_sizes([64], unit=GiB), performance())
+    expected = record['zigzag'].performance(64 * GiB)
+    assert record['partitions'] == 4 and record['size'] == 64 * GiB
+    assert record['total_seal_time'] == expected.total_seal_time
+    assert record['proof_size'] == expected.proof_size
+
+def test_where_and_take_while():
+    records = list(pipeline(stream.sizes(filecoin_zigzag, range(1, 20)), where(lambda r: r['size'] % 2),
+                            take_while(lambda r: r['size'] < 10)))
+    assert [r['size'] for r in records] == [1, 3, 5, 7, 9]
+
+def test_sweep_records_match_sweep():
+    table = sweep.sweep(axes, max_workers=0)
+    records = list(stream.sweep_records(axes, max_workers=0))
+    assert [r['partitions'] for r in records] == table.values('partitions')
+    assert np.array_equal([r['total_seal_time'] for r in records], table.columns['total_seal_time'])
+
+def test_csv_and_column_sinks(tmp_path):
+    mvs_stage = stream.minimum_viable_sector_size(filecoin_scaling_requirements)
+    records = list(pipeline(grid(axes), performance(), mvs_stage))
+    columns = ['partitions', 'total_seal_time', 'minimum_viable_sector_size']
+
+    assert stream.write_csv(iter(records), str(tmp_path / 'out.csv'), columns) == 8
+    with open(str(tmp_path / 'out.csv')) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == columns and len(rows) == 9
+
+    assert stream.write_columns(iter(records), str(tmp_path / 'columns'), columns, chunksize=3) == 8
+    read = stream.read_columns(str(tmp_path / 'columns'), columns)
+    assert np.array_equal(read['total_seal_time'], [r['total_seal_time'] for r in records])
+    mvs = [np.nan if r['minimum_viable_sector_size'] is None else r['minimum_viable_sector_size'] for r in records]
+    assert np.array_equal(read['minimum_viable_sector_size'], mvs, equal_nan=True)
+
+def test_best():
+    record = stream.best(pipeline(grid(axes), performance()), key=lambda r: r['total_seal_time'])
+    assert record['total_seal_time'] == min(r['total_seal_time'] for r in pipeline(grid(axes), performance()))
+    assert stream.best(iter([]), key=len) is None
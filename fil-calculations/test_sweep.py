@@ -0,0 +1,36 @@
+from dataclasses import replace
+
+import numpy as np
+
+import sweep
+from perf_data import filecoin_zigzag
+from proofs import GiB, blake2s, pedersen
+from sweep import make_zigzag
+
+axes = {'merkle_hash': [pedersen, blake2s], 'partitions': [1, 8], 'apex_height': [0, 10], 'layers': [10, 11]}
+
+def test_sweep_matches_direct_evaluation():
+    table = sweep.sweep(axes, max_workers=0)
+    assert len(table) == 16
+    for row in range(len(table)):
+        zigzag = make_zigzag(table.point(row), filecoin_zigzag)
+        assert table.columns['total_seal_time'][row] == zigzag.total_seal_time()
+        assert table.columns['proof_size'][row] == zigzag.proof_size()
+
+def test_results_do_not_depend_on_workers_or_chunks():
+    in_process = sweep.sweep(axes, max_workers=0, chunksize=16)
+    pooled = sweep.sweep(axes, max_workers=2, chunksize=3)
+    for (name, column) in in_process.columns.items():
+        assert np.array_equal(column, pooled.columns[name], equal_nan=True)
+
+def test_make_zigzag():
+    zigzag = make_zigzag({'merkle_hash': blake2s, 'layers': 11}, filecoin_zigzag)
+    assert zigzag == make_zigzag({'layers': 11}, filecoin_zigzag).scaled_for_new_hash(blake2s)
+    assert zigzag.security.layers == 11
+    # Security axes go through replace_security: a schedule's total is derived again for the new layer count.
+    scheduled = make_zigzag({'challenges': 333, 'taper': 0.3, 'taper_layers': 7}, filecoin_zigzag)
+    assert make_zigzag({'layers': 11}, scheduled).security.total_challenges == \
+           scheduled.security.total_challenges + 333
+
+    without_instance = replace(filecoin_zigzag, instance=None, size=64 * GiB)
+    assert make_zigzag({'merkle_hash': blake2s}, without_instance).merkle_hash == blake2s
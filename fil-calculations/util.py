@@ -18,6 +18,8 @@ def humanize_bytes(bytes, precision=1):
     '1.31 GiB'
     >>> humanize_bytes(1024*1234*1111,1)
     '1.3 GiB'
+    >>> humanize_bytes(None)
+    'None'
     """
     abbrevs = (
         (1<<50, 'PiB'),
@@ -27,6 +29,8 @@ def humanize_bytes(bytes, precision=1):
         (1<<10, 'KiB'),
         (1, 'bytes')
     )
+    if bytes is None:
+        return 'None'
     if bytes == 1:
         return '1 byte'
     for factor, suffix in abbrevs:
@@ -46,3 +50,18 @@ def humanize_seconds(seconds, precision=1):
     seconds = seconds % minute
 
     return ('-' if (seconds < 0) else '') + '%02d:%02d:%.*f' % (hours, minutes, precision, seconds)
+
+
+def lazy_attributes(module_globals, builders):
+    """Return a module __getattr__ which builds attributes on first access.
+
+    builders maps attribute names to zero-argument functions. Each result is stored in the module, so it is built once.
+    Usage, at the end of a module: __getattr__ = lazy_attributes(globals(), {'example': lambda: expensive()})
+    """
+    def __getattr__(name):
+        if name in builders:
+            value = module_globals[name] = builders[name]()
+            return value
+        raise AttributeError(f"module {module_globals['__name__']!r} has no attribute {name!r}")
+
+    return __getattr__